@@ -1,5 +1,18 @@
 import re
-from bs4 import BeautifulSoup
+
+# One pattern for every dated summary field, so a page is scanned once no matter
+# how many fields we pull (Policy Term also captures its end date)
+SUMMARY_DATES_RE = re.compile(
+    r'(?P<label>Create Date|Bind Date|Policy Term):</dt>\s*<dd[^>]*>\s*'
+    r'(?P<start>\d{2}/\d{2}/\d{4})(?:[^<-]*-\s*(?P<end>\d{2}/\d{2}/\d{4}))?'
+)
+
+def extract_summary_dates(html: str) -> dict:
+    """Collect Create Date, Bind Date and Policy Term dates in a single pass over the HTML"""
+    dates = {}
+    for match in SUMMARY_DATES_RE.finditer(html):
+        dates.setdefault(match.group('label'), (match.group('start'), match.group('end')))
+    return dates
 
 # HTML snippet from the user
 html_content = '''
@@ -27,49 +40,20 @@ html_content = '''
 </div>
 '''
 
-# Test different extraction methods
-print("Testing HTML parsing methods for policy term extraction...")
-
-# Method 1: BeautifulSoup
-soup = BeautifulSoup(html_content, 'html.parser')
-
-# Find dt containing "Policy Term:" and get the next dd
-dt_elements = soup.find_all('dt')
-for dt in dt_elements:
-    if dt.get_text(strip=True) == 'Policy Term:':
-        dd = dt.find_next_sibling('dd')
-        if dd:
-            policy_term = dd.get_text(strip=True)
-            print(f"Method 1 (BeautifulSoup): Found policy term: '{policy_term}'")
-            
-            # Extract dates
-            dates = [date.strip() for date in policy_term.split('-')]
-            if len(dates) == 2:
-                effective_date = dates[0].strip()
-                expiration_date = dates[1].strip()
-                print(f"  Effective Date: '{effective_date}'")
-                print(f"  Expiration Date: '{expiration_date}'")
+# Extract all summary dates in one scan
+print("Testing summary date extraction...")
 
-# Method 2: Regex on full HTML
-pattern = r'Policy Term:.*?<dd[^>]*>([^<]+)</dd>'
-match = re.search(pattern, html_content, re.DOTALL)
-if match:
-    policy_term = match.group(1).strip()
-    print(f"Method 2 (Regex): Found policy term: '{policy_term}'")
-    
-    dates = [date.strip() for date in policy_term.split('-')]
-    if len(dates) == 2:
-        effective_date = dates[0].strip()
-        expiration_date = dates[1].strip()
-        print(f"  Effective Date: '{effective_date}'")
-        print(f"  Expiration Date: '{expiration_date}'")
+dates = extract_summary_dates(html_content)
+for label in ('Create Date', 'Bind Date'):
+    if label in dates:
+        print(f"Found {label.lower()}: '{dates[label][0]}'")
 
-# Method 3: More robust regex for date patterns
-date_pattern = r'Policy Term:.*?(\d{2}/\d{2}/\d{4})\s*-\s*(\d{2}/\d{2}/\d{4})'
-match = re.search(date_pattern, html_content)
-if match:
-    effective_date = match.group(1)
-    expiration_date = match.group(2)
-    print(f"Method 3 (Date Pattern Regex): Found dates: '{effective_date}' - '{expiration_date}'")
+if 'Policy Term' in dates:
+    effective_date, expiration_date = dates['Policy Term']
+    print(f"Found policy term: '{effective_date} - {expiration_date}'")
+    print(f"  Effective Date: '{effective_date}'")
+    print(f"  Expiration Date: '{expiration_date}'")
+else:
+    print("Policy term not found")
 
-print("\nCompleted testing.") 
\ No newline at end of file
+print("\nCompleted testing.")
\ No newline at end of file
@@ -1,15 +1,25 @@
 import asyncio
+import httpx
 import logging
+from lxml import etree
 from scraper import ISCScraper
 import os
 from dotenv import load_dotenv
 
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# Saved Playwright session so repeated debug runs skip the login round trip
+AUTH_STATE_PATH = '.auth.json'
+
 async def debug_and_save_response():
     """Authenticate, make request, save response to temp file"""
     
@@ -28,7 +38,7 @@ async def debug_and_save_response():
     print("=" * 60)
     
     # Initialize scraper
-    scraper = ISCScraper(username, password, headless=True)
+    scraper = ISCScraper(username, password, headless=True, storage_state_path=AUTH_STATE_PATH)
     await scraper.initialize()
     
     # Login
@@ -39,6 +49,14 @@ async def debug_and_save_response():
         return
     print("✅ Login successful!")
     
+    # Hand the session cookies to a plain HTTP client - the search needs no JS,
+    # so the browser can be shut down before making the request
+    jar = httpx.Cookies()
+    for cookie in await scraper.context.cookies():
+        jar.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie.get('path', '/'))
+    user_agent = await scraper.page.evaluate("navigator.userAgent")
+    await scraper.close()
+    
     # Make the GET request
     print(f"🚀 Making GET request for {test_policy}...")
     
@@ -70,36 +88,60 @@ async def debug_and_save_response():
         'producer_last': ''
     }
     
-    response = await scraper.page.request.get(search_url, params=params)
+    temp_file = f"debug_response_{test_policy.replace('-', '_')}.html"
+    policy_bytes = test_policy.encode()
+    data_ids = []
+    contains_policy = False
+    contains_login = False
+    contains_no_results = False
+    length = 0
+    tail = b''
     
-    if response.status == 200:
-        content = await response.text()
-        
-        # Save response to temp file
-        temp_file = f"debug_response_{test_policy.replace('-', '_')}.html"
-        with open(temp_file, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
+    # Stream the body: chunks go straight to disk and into an incremental lxml
+    # parser, so the full page is never held as one Python string
+    parser = etree.HTMLPullParser(events=('end',), tag='tr')
+    
+    async with httpx.AsyncClient(http2=True, cookies=jar, headers={'User-Agent': user_agent}, timeout=30) as client:
+        async with client.stream('GET', search_url, params=params) as response:
+            if response.status_code == 200:
+                with open(temp_file, 'wb') as f:
+                    async for chunk in response.aiter_bytes():
+                        f.write(chunk)
+                        length += len(chunk)
+                        parser.feed(chunk)
+                        
+                        # Substring checks over the chunk plus the previous chunk's tail,
+                        # so matches split across chunk boundaries are still seen
+                        window = (tail + chunk).lower()
+                        contains_policy = contains_policy or policy_bytes.lower() in window
+                        contains_login = contains_login or b'login' in window
+                        contains_no_results = contains_no_results or b'no results' in window
+                        tail = window[-32:]
+                        
+                        for _, row in parser.read_events():
+                            if row.get('data-id'):
+                                data_ids.append(row.get('data-id'))
+                            row.clear()
+    
+    if response.status_code == 200:
         print(f"📁 Response saved to: {temp_file}")
-        print(f"📊 Response length: {len(content)} characters")
-        print(f"🔍 Contains policy number: {test_policy in content}")
-        
-        # Quick check for common patterns
-        import re
-        data_ids = re.findall(r'data-id="(\d+)"', content)
+        print(f"📊 Response length: {length} bytes")
+        print(f"🔍 Contains policy number: {contains_policy}")
         print(f"🔢 Found {len(data_ids)} data-id attributes")
         
-        if "login" in content.lower():
+        if contains_login:
             print("⚠️ Response contains 'login' - might be redirected")
         
-        if "no results" in content.lower():
+        if contains_no_results:
             print("⚠️ Response contains 'no results'")
             
     else:
-        print(f"❌ HTTP error: {response.status}")
+        print(f"❌ HTTP error: {response.status_code}")
     
-    await scraper.close()
     print(f"\n✅ Debug complete! Check {temp_file} for full response")
 
 if __name__ == "__main__":
-    asyncio.run(debug_and_save_response()) 
\ No newline at end of file
+    if uvloop:
+        uvloop.run(debug_and_save_response())
+    else:
+        asyncio.run(debug_and_save_response()) 
\ No newline at end of file
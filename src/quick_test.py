@@ -4,9 +4,17 @@ from scraper import ISCScraper
 import os
 from dotenv import load_dotenv
 
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
+# Saved Playwright session so repeated debug runs skip the login round trip
+AUTH_STATE_PATH = '.auth.json'
+
 async def test_fast_method():
     """Quick test of the fixed fast method"""
     
@@ -14,7 +22,7 @@ async def test_fast_method():
     username = os.getenv('ISC_USERNAME')
     password = os.getenv('ISC_PASSWORD')
     
-    scraper = ISCScraper(username, password, headless=True)
+    scraper = ISCScraper(username, password, headless=True, storage_state_path=AUTH_STATE_PATH)
     await scraper.initialize()
     
     if not await scraper.login():
@@ -23,23 +31,34 @@ async def test_fast_method():
     
     print("✅ Testing simplified fast method...")
     
-    # Test the policy we know works
-    test_policy = 'SCB-GL-000078314'
-    app_id = await scraper.search_by_policy_fast(test_policy)
-    
-    if app_id:
-        print(f"🚀 SUCCESS! Fast method found app_id: {app_id}")
-        
-        # Test getting full data
-        result = await scraper.get_application_fast(app_id)
-        if result:
-            print(f"✅ Got company: {result.get('insured_company_name', 'N/A')}")
+    # Test the policies we know work - all share the one logged-in scraper
+    test_policies = ['SCB-GL-000078314']
+    sem = asyncio.Semaphore(10)
+    
+    async def bounded(policy):
+        async with sem:
+            app_id = await scraper.search_by_policy_fast(policy)
+            result = await scraper.get_application_fast(app_id) if app_id else None
+            return policy, app_id, result
+    
+    outcomes = await asyncio.gather(*[bounded(p) for p in test_policies])
+    
+    for policy, app_id, result in outcomes:
+        if app_id:
+            print(f"🚀 SUCCESS! Fast method found app_id for {policy}: {app_id}")
+            
+            # Check the full data
+            if result:
+                print(f"✅ Got company: {result.get('applicant_company', 'N/A')}")
+            else:
+                print("⚠️ App_id found but couldn't get details")
         else:
-            print("⚠️ App_id found but couldn't get details")
-    else:
-        print("❌ Fast method still failed")
+            print(f"❌ Fast method still failed for {policy}")
     
     await scraper.close()
 
 if __name__ == "__main__":
-    asyncio.run(test_fast_method()) 
\ No newline at end of file
+    if uvloop:
+        uvloop.run(test_fast_method())
+    else:
+        asyncio.run(test_fast_method())
@@ -3,6 +3,11 @@ from requests_hybrid import ISCRequestsHybrid
 import os
 from dotenv import load_dotenv
 
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
 async def quick_test():
     load_dotenv()
     client = ISCRequestsHybrid(os.getenv('ISC_USERNAME'), os.getenv('ISC_PASSWORD'))
@@ -11,14 +16,24 @@ async def quick_test():
     await client.login()
     
     print("🔎 Testing policy extraction...")
-    result = client.process_policy('SCB-GL-000078314')
+    test_policies = ['SCB-GL-000078314']
+    sem = asyncio.Semaphore(10)
     
-    if result:
-        print("🎯 SUCCESS! Extracted data:")
-        for key, value in result.items():
-            print(f"   {key}: {value}")
-    else:
-        print("❌ Failed to extract data")
+    async def bounded(policy):
+        # process_policy is blocking (requests), so run it in a worker thread
+        async with sem:
+            return policy, await asyncio.to_thread(client.process_policy, policy)
+    
+    for policy, result in await asyncio.gather(*[bounded(p) for p in test_policies]):
+        if result:
+            print(f"🎯 SUCCESS! Extracted data for {policy}:")
+            for key, value in result.items():
+                print(f"   {key}: {value}")
+        else:
+            print(f"❌ Failed to extract data for {policy}")
 
 if __name__ == "__main__":
-    asyncio.run(quick_test()) 
\ No newline at end of file
+    if uvloop:
+        uvloop.run(quick_test())
+    else:
+        asyncio.run(quick_test())
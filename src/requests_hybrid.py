@@ -1,39 +1,155 @@
 import asyncio
+import atexit
+import glob
+import httpx
+import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 import logging
+from logging.handlers import MemoryHandler
+from lxml import etree, html as lxml_html
 from playwright.async_api import async_playwright
 import re
 from typing import Dict, Optional, List
 import os
 from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from urllib.parse import urljoin
+from cachetools import TTLCache
+import threading
 import time
 import subprocess
 import sys
+import weakref
+
+# Package import for the app and tests, plain import for the scripts run from inside src/
+try:
+    from src.utils import SEARCH_PARAMS, date_key
+except ImportError:
+    from utils import SEARCH_PARAMS, date_key
+
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+HOME_URL = "https://isc.onlinemga.com/amp/"
+LOGIN_URL = "https://isc.onlinemga.com/amp/login"
+SEARCH_URL = "https://isc.onlinemga.com/amp/search/advancedsearch"
+DETAIL_URL = "https://isc.onlinemga.com/amp/detail/view/{app_id}"
+
+# Session cookies and the policy -> app_id map survive between runs so a re-run can skip the browser login
+CACHE_DIR = Path.home() / '.cache' / 'isc-slayer'
+COOKIE_CACHE_PATH = CACHE_DIR / 'cookies.json'
+APP_ID_CACHE_PATH = CACHE_DIR / 'app_ids.json'
+
+# Seconds a single GET may stall before it counts as failed, so one hung request can't stall a batch
+REQUEST_TIMEOUT = 30
+# Seconds a whole policy (search + detail, retries included) may run before the batch gives up on it
+POLICY_TIMEOUT = 60
+
+# Statuses that can't carry a cancellation date yet
+ACTIVE_STATUSES = frozenset({'active', 'bound', 'issued'})
+
+# Pacing for everything sent to the ISC host - bursts past this get queued rather than throttled by the server
+REQUESTS_PER_SECOND = 20
+
+# Responses that mean "slow down" - the async path backs off, retries and lowers its concurrency on these
+THROTTLE_STATUSES = frozenset({429, 503})
+ASYNC_ATTEMPTS = 3
+
+# Parsed pages are reused within a run; search rows expire sooner since status changes more often
+DETAIL_CACHE_TTL = 300
+SEARCH_CACHE_TTL = 60
+
+# Proper headers to mimic browser
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    # urllib3 only lists br/zstd when the brotli/zstandard decoders are importable (httpx uses the same ones)
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# Hot-path patterns run on RE2 when it is installed: its automaton matches in linear time, so a
+# malformed page can't send the lazy .*? patterns into catastrophic backtracking. RE2 takes no
+# flag arguments, hence the inline (?s) instead of re.DOTALL
+try:
+    import re2 as _regex
+except ImportError:
+    _regex = re
+
+# Search results rows (HTML uses single quotes!) - only used when lxml can't parse the page
+_ROW_RE = _regex.compile(r"(?s)<tr[^>]*class='[^']*itemRow[^']*'[^>]*data-id='(\d+)'[^>]*>(.*?)</tr>")
+_TD_RE = _regex.compile(r'(?s)<td[^>]*>(.*?)</td>')
+
+# Search results rows carrying an app_id
+_RESULT_ROWS_XPATH = "//tr[contains(concat(' ', normalize-space(@class), ' '), ' itemRow ')][@data-id]"
+_lxml_local = threading.local()
+
+def _lxml_tools() -> tuple:
+    """This thread's reusable HTML parser and compiled row XPath (lxml parsers mustn't be shared across threads)"""
+    tools = getattr(_lxml_local, 'tools', None)
+    if tools is None:
+        tools = _lxml_local.tools = (
+            lxml_html.HTMLParser(recover=True, collect_ids=False),
+            etree.XPath(_RESULT_ROWS_XPATH)
+        )
+    return tools
+
+# Tags and the entities that show up in cells, stripped/decoded in a single pass (stdlib re - it takes a callback)
+_CELL_MARKUP_RE = re.compile(r'<[^>]+>|&(?:nbsp|amp|lt|gt|quot|#\d+);')
+_CELL_ENTITIES = {'&nbsp;': ' ', '&amp;': '&', '&lt;': '<', '&gt;': '>', '&quot;': '"'}
+
+def _cell_markup_sub(match) -> str:
+    token = match.group(0)
+    if token[0] == '<':
+        return ''
+    if token[1] == '#':
+        return chr(int(token[2:-1]))
+    return _CELL_ENTITIES[token]
+
+# Detail page patterns. Cancellation date and policy term are found in one scan of the page;
+# the others are fallbacks for different HTML structures. The label-to-dates gap is capped at 300 chars
+_DETAIL_RE = _regex.compile(
+    r'(?s)(?P<cancel>Cancellation Date:\s*</dt>\s*<dd[^>]*>\s*(?P<cancel_date>\d{2}/\d{2}/\d{4}))'
+    r'|(?P<term>Policy Term:.{0,300}?(?P<start>\d{2}/\d{2}/\d{4})\s*-\s*(?P<end>\d{2}/\d{2}/\d{4}))'
+)
+_CANCEL_ALT_RE = _regex.compile(r'Cancellation Date:\s*</dt>\s*<dd[^>]*>([^<]+)</dd>')
+_TERM_ALT_RE = _regex.compile(r'<dt[^>]*>Policy Term:</dt>\s*<dd[^>]*>([^<]+)</dd>')
+_DATE_RE = _regex.compile(r'(\d{2}/\d{2}/\d{4})')
+_DATE_RANGE_RE = _regex.compile(r'(\d{2}/\d{2}/\d{4})\s*-\s*(\d{2}/\d{2}/\d{4})')
 
 # Global flag to track if browsers are installed
 _browsers_installed = False
 
+def _playwright_browsers_dir() -> str:
+    """Where `playwright install` puts browsers on this platform"""
+    if os.getenv('PLAYWRIGHT_BROWSERS_PATH'):
+        return os.getenv('PLAYWRIGHT_BROWSERS_PATH')
+    if sys.platform == 'win32':
+        return os.path.join(os.getenv('LOCALAPPDATA', ''), 'ms-playwright')
+    if sys.platform == 'darwin':
+        return os.path.expanduser('~/Library/Caches/ms-playwright')
+    return os.path.expanduser('~/.cache/ms-playwright')
+
 def ensure_playwright_browsers():
     """Ensure Playwright browsers are installed (call once at startup)"""
     global _browsers_installed
     if _browsers_installed:
         return True
     
-    try:
-        # Check if chromium is available by trying to get its version
-        from playwright.sync_api import sync_playwright
-        with sync_playwright() as p:
-            try:
-                # Try to get browser path - if this fails, browser isn't installed
-                browser_path = p.chromium.executable_path
-                _browsers_installed = True
-                logging.info(f"Playwright browsers already installed at: {browser_path}")
-                return True
-            except Exception:
-                pass
-    except Exception:
-        pass
+    # Playwright drops this marker once a browser finished installing - no need to start Playwright to check
+    installed = glob.glob(os.path.join(_playwright_browsers_dir(), 'chromium*', 'INSTALLATION_COMPLETE'))
+    if installed:
+        _browsers_installed = True
+        logging.info(f"Playwright browsers already installed at: {os.path.dirname(installed[0])}")
+        return True
     
     # If we get here, browsers need to be installed
     logging.info("Installing Playwright browsers...")
@@ -53,53 +169,263 @@ def ensure_playwright_browsers():
         logging.error(f"Failed to install Playwright browsers: {e}")
         return False
 
+# One Chromium per event loop, reused by every login on it (Playwright objects can't cross loops)
+_shared_browsers = weakref.WeakKeyDictionary()
+
+async def _launch_chromium(playwright):
+    """Launch Chromium, installing it first if it's missing"""
+    try:
+        return await playwright.chromium.launch(headless=True)
+    except Exception as e:
+        if "Executable doesn't exist" not in str(e):
+            raise
+        # Install browsers and try again
+        logging.info("Installing Playwright browsers...")
+        subprocess.run([sys.executable, "-m", "playwright", "install", "chromium"], 
+                     check=True, capture_output=True, text=True, timeout=120)
+        # Try again with cloud-safe args
+        return await playwright.chromium.launch(
+            headless=True,
+            args=["--no-sandbox", "--disable-setuid-sandbox"]
+        )
+
+async def _get_shared_browser():
+    """Running Chromium for the current event loop, started on first use"""
+    loop = asyncio.get_running_loop()
+    entry = _shared_browsers.get(loop)
+    if entry is None:
+        entry = _shared_browsers[loop] = {'lock': asyncio.Lock(), 'playwright': None, 'browser': None}
+    
+    async with entry['lock']:
+        if entry['browser'] is None or not entry['browser'].is_connected():
+            if entry['playwright'] is None:
+                entry['playwright'] = await async_playwright().start()
+            entry['browser'] = await _launch_chromium(entry['playwright'])
+    return entry['browser']
+
+async def _stop_shared_browser(entry: Dict):
+    if entry['browser'] is not None:
+        await entry['browser'].close()
+    if entry['playwright'] is not None:
+        await entry['playwright'].stop()
+
+@atexit.register
+def _close_shared_browsers():
+    """Shut down browsers whose loop is still usable; the rest die with the Playwright driver"""
+    for loop, entry in list(_shared_browsers.items()):
+        if loop.is_closed() or loop.is_running():
+            continue
+        try:
+            loop.run_until_complete(_stop_shared_browser(entry))
+        except Exception:
+            pass
+
+class _TimedMemoryHandler(MemoryHandler):
+    """MemoryHandler that also flushes once `interval` seconds have passed since the last flush"""
+    
+    def __init__(self, capacity: int, interval: float, target: logging.Handler):
+        super().__init__(capacity, flushLevel=logging.ERROR, target=target)
+        self.interval = interval
+        self._last_flush = time.monotonic()
+    
+    def shouldFlush(self, record) -> bool:
+        return super().shouldFlush(record) or time.monotonic() - self._last_flush >= self.interval
+    
+    def flush(self):
+        super().flush()
+        self._last_flush = time.monotonic()
+
+# Batch progress is buffered and written a few times a second instead of one stdout write per policy
+_progress_handler = _TimedMemoryHandler(capacity=32, interval=0.25, target=logging.StreamHandler(sys.stdout))
+_progress_log = logging.getLogger('isc_slayer.progress')
+_progress_log.setLevel(logging.INFO)
+_progress_log.propagate = False
+_progress_log.addHandler(_progress_handler)
+
+class _TokenBucket:
+    """Thread-safe token bucket; callers reserve a token and sleep however long it says"""
+    
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self) -> float:
+        """Take a token, returning the seconds to wait before it may be used"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Going negative queues the caller behind everyone already waiting
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+class _AIMDLimiter:
+    """Async concurrency limit that halves when the server pushes back and grows by one after a run of clean responses"""
+    
+    def __init__(self, limit: int, increase_after: int = 20):
+        self.max_limit = limit
+        self.limit = limit
+        self.increase_after = increase_after
+        self._in_flight = 0
+        self._streak = 0
+        self._cond = asyncio.Condition()
+    
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+    
+    async def __aexit__(self, *exc_info):
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+    
+    async def record(self, status_code: int):
+        """Feed back a response status: throttling halves the limit, a streak of successes raises it"""
+        async with self._cond:
+            if status_code in THROTTLE_STATUSES:
+                self._streak = 0
+                if self.limit > 1:
+                    self.limit = max(1, self.limit // 2)
+                    logging.warning(f"Server throttling (HTTP {status_code}) - concurrency cut to {self.limit}")
+            elif status_code == 200:
+                self._streak += 1
+                if self._streak >= self.increase_after and self.limit < self.max_limit:
+                    self._streak = 0
+                    self.limit += 1
+                    self._cond.notify_all()
+
+class _SearchRowScanner:
+    """Buffers a streamed search results page until the itemRow holding one policy has closed"""
+    
+    def __init__(self, policy_number: str):
+        self._needle = policy_number.encode()
+        self._buf = bytearray()
+        self._pos = 0
+        self.end = None
+    
+    def feed(self, chunk: bytes) -> bool:
+        """Add a chunk, returning True once the policy's row is complete"""
+        self._buf += chunk
+        while True:
+            # The policy number also sits in the search form above the table, so only look inside rows
+            start = self._buf.find(b'itemRow', self._pos)
+            if start == -1:
+                # Back off a little so a marker split across chunks is still found
+                self._pos = max(self._pos, len(self._buf) - len(b'itemRow'))
+                return False
+            end = self._buf.find(b'</tr>', start)
+            if end == -1:
+                self._pos = start
+                return False
+            if self._buf.find(self._needle, start, end) != -1:
+                self.end = end + len(b'</tr>')
+                return True
+            self._pos = end
+    
+    def html(self, encoding: Optional[str]) -> str:
+        """Page up to the end of the matched row (everything read if it never matched)"""
+        return self._buf[:self.end].decode(encoding or 'utf-8', errors='replace')
+
 class ISCRequestsHybrid:
     """
     Hybrid approach: Use Playwright for login, then extract cookies for requests library
     This is most similar to your original MechanicalSoup workflow
     """
     
-    def __init__(self, username: str, password: str):
+    # The login form is plain HTML, so a GET + POST does the job; set True to always log in through Chromium
+    use_playwright_login = False
+    
+    def __init__(self, username: str, password: str, use_disk_cache: bool = True, requests_per_second: float = REQUESTS_PER_SECOND,
+                 needs_expiration: bool = True, needs_cancellation: bool = True, use_http_cache: bool = False):
         self.username = username
         self.password = password
-        self.session = requests.Session()
+        self.use_disk_cache = use_disk_cache
+        # What callers want from the detail page - with fetch_detail='auto' it is only fetched when it adds one of these
+        self.needs_expiration = needs_expiration
+        self.needs_cancellation = needs_cancellation
+        self._details_skipped = 0
+        self.session = self._create_session(use_http_cache)
+        # Room for every worker thread to keep its own connection instead of opening (and dropping) extras
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            pool_block=True,
+            # 429/503 honour Retry-After; only GETs are retried so a login POST is never replayed
+            max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504], allowed_methods={'GET'})
+        )
+        self.session.mount('https://', adapter)
+        self.session.headers.update(BROWSER_HEADERS)
         self.authenticated = False
+        self._async_client = None
+        self._aimd = None
+        self._app_ids = self._load_app_id_cache() if use_disk_cache else {}
+        self._detail_cache = TTLCache(maxsize=2048, ttl=DETAIL_CACHE_TTL)
+        self._search_cache = TTLCache(maxsize=2048, ttl=SEARCH_CACHE_TTL)
+        self._cache_lock = threading.Lock()
+        self._rate_limiter = _TokenBucket(requests_per_second)
+        
+    def _create_session(self, use_http_cache: bool) -> requests.Session:
+        """Plain session, or one backed by an on-disk HTTP cache for detail pages when requests-cache is installed"""
+        if not use_http_cache:
+            return requests.Session()
+        if requests_cache is None:
+            logging.warning("requests-cache is not installed, running without the HTTP cache")
+            return requests.Session()
         
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        return requests_cache.CachedSession(
+            str(CACHE_DIR / 'http_cache'),
+            backend='sqlite',
+            expire_after=DETAIL_CACHE_TTL,
+            # Detail pages only - search pages are streamed and cut short, so there is nothing whole to store
+            urls_expire_after={'isc.onlinemga.com/amp/detail/view': DETAIL_CACHE_TTL, '*': requests_cache.DO_NOT_CACHE},
+            allowable_methods=['GET'],
+            cache_control=True,
+            stale_if_error=True,
+            # Pages are per-account, so a different login must not get someone else's copy
+            match_headers=['Cookie']
+        )
+    
+    def session_valid(self) -> bool:
+        """Local check (no request) that a logged-in client can be reused: no session cookie has expired yet"""
+        if not self.authenticated or not len(self.session.cookies):
+            return False
+        now = time.time()
+        return not any(cookie.expires is not None and cookie.expires <= now for cookie in self.session.cookies)
+    
     async def login(self) -> bool:
-        """Login using Playwright, then extract cookies for requests session"""
-        playwright = await async_playwright().start()
+        """Login with a plain form POST (Playwright as fallback), leaving the cookies on the requests session"""
+        # Cookies from a previous run are still good for a while - no browser needed then
+        # (checking them is a blocking GET, so it runs off the event loop like the form login)
+        if self.use_disk_cache and await asyncio.to_thread(self._load_cached_cookies):
+            self.authenticated = True
+            return True
+        
+        if not self.use_playwright_login:
+            if await asyncio.to_thread(self._login_with_form):
+                if self.use_disk_cache:
+                    await asyncio.to_thread(self._save_cached_cookies)
+                self.authenticated = True
+                return True
+            logging.info("Form login failed, falling back to Playwright")
         
         try:
-            # Try to launch browser normally first
-            browser = await playwright.chromium.launch(headless=True)
+            browser = await _get_shared_browser()
         except Exception as e:
-            if "Executable doesn't exist" in str(e):
-                # Install browsers and try again
-                logging.info("Installing Playwright browsers...")
-                import subprocess
-                import sys
-                try:
-                    subprocess.run([sys.executable, "-m", "playwright", "install", "chromium"], 
-                                 check=True, capture_output=True, text=True, timeout=120)
-                    # Try again with cloud-safe args
-                    browser = await playwright.chromium.launch(
-                        headless=True,
-                        args=["--no-sandbox", "--disable-setuid-sandbox"]
-                    )
-                except Exception as install_error:
-                    logging.error(f"Failed to install/launch browser: {install_error}")
-                    await playwright.stop()
-                    return False
-            else:
-                logging.error(f"Browser launch failed: {e}")
-                await playwright.stop()
-                return False
+            logging.error(f"Browser launch failed: {e}")
+            return False
         
-        page = await browser.new_page()
+        # A fresh context per login keeps sessions apart while the browser itself stays up
+        context = await browser.new_context()
+        page = await context.new_page()
         
         try:
             # Login with Playwright
-            await page.goto("https://isc.onlinemga.com/amp/login")
+            await page.goto(LOGIN_URL)
             await page.fill('input[name="username"]', self.username)
             await page.fill('input[name="password"]', self.password)
             await page.click('button.btn.btn-lg.btn-block.btn-default[type="submit"]')
@@ -110,7 +436,7 @@ class ISCRequestsHybrid:
                 return False
             
             # Extract all cookies from Playwright
-            cookies = await page.context.cookies()
+            cookies = await context.cookies()
             
             # Add cookies to requests session
             for cookie in cookies:
@@ -122,15 +448,8 @@ class ISCRequestsHybrid:
                     secure=cookie.get('secure', False)
                 )
             
-            # Set proper headers to mimic browser
-            self.session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            })
+            if self.use_disk_cache:
+                await asyncio.to_thread(self._save_cached_cookies)
             
             self.authenticated = True
             return True
@@ -140,82 +459,231 @@ class ISCRequestsHybrid:
             return False
             
         finally:
-            await browser.close()
-            await playwright.stop()
+            await context.close()
+    
+    def _login_with_form(self) -> bool:
+        """Log in without a browser: GET the form for its hidden fields (CSRF token etc.), then POST it"""
+        try:
+            response = self.session.get(LOGIN_URL, timeout=15)
+            action, form_data, csrf_token = self._parse_login_form(response.text, response.url)
+            form_data.update({'username': self.username, 'password': self.password})
+            
+            headers = {'Referer': response.url}
+            if csrf_token:
+                headers['X-CSRF-TOKEN'] = csrf_token
+            response = self.session.post(action, data=form_data, headers=headers, timeout=15)
+            
+            # A rejected login lands back on the login page
+            if response.status_code == 200 and "login" not in response.url:
+                return True
+        except Exception as e:
+            logging.warning(f"Form login failed: {e}")
+        
+        self.session.cookies.clear()
+        return False
+    
+    def _parse_login_form(self, html: str, page_url: str) -> tuple:
+        """Login form as (action url, hidden fields, csrf meta token)"""
+        tree = lxml_html.fromstring(html, parser=_lxml_tools()[0])
+        forms = tree.xpath("//form[.//input[@name='password']]")
+        if not forms:
+            raise Exception("Login form not found")
+        form = forms[0]
+        
+        action = urljoin(page_url, form.get('action') or page_url)
+        hidden = {
+            field.get('name'): field.get('value', '')
+            for field in form.xpath(".//input[@type='hidden'][@name]")
+        }
+        csrf_meta = tree.xpath("//meta[@name='csrf-token']/@content")
+        return action, hidden, csrf_meta[0] if csrf_meta else None
+    
+    def _load_cached_cookies(self) -> bool:
+        """Restore cookies saved by an earlier login and check the session is still alive"""
+        try:
+            with open(COOKIE_CACHE_PATH, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        
+        if cached.get('username') != self.username:
+            return False
+        
+        for cookie in cached.get('cookies', []):
+            self.session.cookies.set(**cookie)
+        
+        try:
+            # An expired session gets redirected to the login page
+            response = self.session.get(HOME_URL, timeout=15)
+            if response.status_code == 200 and "login" not in response.url:
+                logging.info(f"Reusing cached session cookies from {COOKIE_CACHE_PATH}")
+                return True
+        except Exception as e:
+            logging.warning(f"Cached session check failed: {e}")
+        
+        self.session.cookies.clear()
+        return False
+    
+    def _save_cached_cookies(self):
+        """Write the session cookies to disk (owner-only permissions - they grant account access)"""
+        cookies = [
+            # expires comes back through cookies.set() so session_valid() still sees it after a restore
+            {'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path, 'secure': c.secure, 'expires': c.expires}
+            for c in self.session.cookies
+        ]
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            fd = os.open(COOKIE_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'username': self.username, 'saved_at': time.time(), 'cookies': cookies}, f)
+        except OSError as e:
+            logging.warning(f"Could not cache session cookies: {e}")
+    
+    def _throttle(self):
+        """Wait for the rate limiter before a request (worker threads)"""
+        time.sleep(self._limiter_wait())
+    
+    async def _throttle_async(self):
+        """Wait for the rate limiter before a request (event loop)"""
+        await asyncio.sleep(self._limiter_wait())
+    
+    def _limiter_wait(self) -> float:
+        wait = self._rate_limiter.reserve()
+        if wait > 0.5:
+            logging.warning(f"Rate limiter holding request for {wait:.2f}s - max_workers is higher than the server pace allows")
+        return wait
     
+    def _cache_get(self, cache: TTLCache, key: str) -> Optional[Dict]:
+        """Copy of a cached result - callers merge into what they get back"""
+        with self._cache_lock:
+            hit = cache.get(key)
+        return dict(hit) if hit is not None else None
+    
+    def _cache_put(self, cache: TTLCache, key: str, value: Dict):
+        with self._cache_lock:
+            cache[key] = dict(value)
+    
+    def _load_app_id_cache(self) -> Dict[str, str]:
+        """policy_number -> app_id map from earlier runs"""
+        try:
+            with open(APP_ID_CACHE_PATH, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_app_id_cache(self):
+        if not self.use_disk_cache:
+            return
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(APP_ID_CACHE_PATH, 'w', encoding='utf-8') as f:
+                json.dump(self._app_ids, f)
+        except OSError as e:
+            logging.warning(f"Could not cache app_id map: {e}")
+    
+    def _build_search_params(self, policy_number: str) -> Dict:
+        """Query string for the advanced search - every filter blank except the policy number"""
+        return {**SEARCH_PARAMS, 'policy_number': policy_number}
+
     def search_by_policy(self, policy_number: str) -> Optional[Dict]:
         """Search for policy using requests and extract data from search results table"""
         if not self.authenticated:
             raise Exception("Must login first")
         
+        cached = self._cache_get(self._search_cache, policy_number)
+        if cached is not None:
+            return cached
+        
         try:
             # This is exactly like your MechanicalSoup workflow!
-            search_url = "https://isc.onlinemga.com/amp/search/advancedsearch"
-            
-            # Parameters based on user's working URL - it's a GET request!
-            params = {
-                'status_id': '',
-                'program_name': '',
-                'effective_date_start': '',
-                'effective_date_end': '',
-                'bind_date_start': '',
-                'bind_date_end': '',
-                'created_date_start': '',
-                'created_date_end': '',
-                'ren': '',
-                'has_esign': '',
-                'has_endorsements': '',
-                'has_claim': '',
-                'has_certificate': '',
-                'item_id': '',
-                'policy_number': policy_number,  # This is the key parameter
-                'agency_name': '',
-                'company_name': '',
-                'applicant_first': '',
-                'applicant_last': '',
-                'applicant_phone': '',
-                'applicant_state': '',
-                'applicant_email': '',
-                'producer_first': '',
-                'producer_last': ''
-            }
+            params = self._build_search_params(policy_number)
             
             # GET request with parameters (just like browser.get(url) with params)
-            response = self.session.get(search_url, params=params)
+            self._throttle()
+            response = self.session.get(SEARCH_URL, params=params, stream=True, timeout=REQUEST_TIMEOUT)
             if response.status_code == 200:
                 # Extract data from search results table (like original scraper)
-                return self._extract_search_results_data(response.text, policy_number)
+                data = self._extract_search_results_data(self._read_until_row(response, policy_number), policy_number)
+                if data:
+                    self._app_ids[policy_number] = data['app_id']
+                    self._cache_put(self._search_cache, policy_number, data)
+                return data
             
+            response.close()
             return None
             
         except Exception as e:
             logging.error(f"Search failed for {policy_number}: {e}")
             return None
 
+    def _read_until_row(self, response: requests.Response, policy_number: str) -> str:
+        """Read a streamed search page only as far as the policy's row"""
+        scanner = _SearchRowScanner(policy_number)
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            if scanner.feed(chunk):
+                # Stop reading here: closing mid-body drops this connection (the pool opens a fresh one
+                # when needed) instead of pulling the rest of the page off the socket
+                response.close()
+                break
+        return scanner.html(response.encoding)
 
+    def search_by_policies(self, policy_numbers: List[str], chunk: int = 25) -> Dict[str, Dict]:
+        """Search many policies per request (comma-separated policy_number), returning {policy_number: data}"""
+        results = {}
+        for found in self._iter_batch_searches(policy_numbers, chunk):
+            results.update(found)
+        return results
 
-    def process_policy(self, policy_number: str) -> Optional[Dict]:
+    def _iter_batch_searches(self, policy_numbers: List[str], chunk: int = 25):
+        """Yield {policy_number: data} per batch as each search returns (cache hits first)"""
+        if not self.authenticated:
+            raise Exception("Must login first")
+        
+        cached_results = {}
+        pending = []
+        for policy_number in policy_numbers:
+            cached = self._cache_get(self._search_cache, policy_number)
+            if cached is not None:
+                cached_results[policy_number] = cached
+            else:
+                pending.append(policy_number)
+        if cached_results:
+            yield cached_results
+        
+        for i in range(0, len(pending), chunk):
+            group = pending[i:i + chunk]
+            try:
+                self._throttle()
+                response = self.session.get(SEARCH_URL, params=self._build_search_params(','.join(group)), timeout=REQUEST_TIMEOUT)
+                found = self._extract_all_search_results(response.text, group) if response.status_code == 200 else {}
+            except Exception as e:
+                logging.error(f"Batch search failed for {len(group)} policies: {e}")
+                return
+            
+            if not found:
+                # Server doesn't take multi-value searches - callers search the rest one at a time
+                logging.info("Batch search returned no rows, falling back to per-policy search")
+                return
+            
+            for policy_number, data in found.items():
+                self._app_ids[policy_number] = data['app_id']
+                self._cache_put(self._search_cache, policy_number, data)
+            yield found
+
+    def process_policy(self, policy_number: str, search_data: Optional[Dict] = None, fetch_detail='auto') -> Optional[Dict]:
         """Process a single policy - get search results data then detail page data"""
         try:
-            # Get data from search results table
-            search_data = self.search_by_policy(policy_number)
+            # Get data from search results table (unless a batch search already did)
+            if search_data is None:
+                search_data = self.search_by_policy(policy_number)
             if not search_data:
                 return None
             
             # Get additional data from detail page
             app_id = search_data.get('app_id')
-            if app_id:
+            if app_id and self._should_fetch_detail(search_data, fetch_detail):
                 detail_data = self.get_application_details(app_id)
-                
-                # Carefully merge detail page data without overwriting search results
-                # Only add missing fields or fields that should come from detail page
-                if detail_data.get('expiration_date'):
-                    search_data['expiration_date'] = detail_data['expiration_date']
-                if detail_data.get('cancellation_date'):
-                    search_data['cancellation_date'] = detail_data['cancellation_date']
-                # If detail page has better effective date, use it
-                if detail_data.get('effective_date'):
-                    search_data['effective_date'] = detail_data['effective_date']
+                self._merge_detail_data(search_data, detail_data)
             
             return search_data
             
@@ -223,19 +691,51 @@ class ISCRequestsHybrid:
             logging.error(f"Error processing policy {policy_number}: {e}")
             return None
 
+    def _should_fetch_detail(self, search_data: Dict, fetch_detail) -> bool:
+        """Whether the detail page adds anything the caller needs (fetch_detail: True, False or 'auto')"""
+        if fetch_detail != 'auto':
+            return bool(fetch_detail)
+        if self.needs_expiration:
+            return True
+        # Only non-active policies can have a cancellation date, and only the detail page shows it
+        if self.needs_cancellation and search_data.get('status', '').lower() not in ACTIVE_STATUSES:
+            return True
+        
+        with self._cache_lock:
+            self._details_skipped += 1
+        return False
+
+    def _merge_detail_data(self, search_data: Dict, detail_data: Dict) -> None:
+        """Carefully merge detail page data without overwriting search results"""
+        # Only add missing fields or fields that should come from detail page
+        if detail_data.get('expiration_date'):
+            search_data['expiration_date'] = detail_data['expiration_date']
+        if detail_data.get('cancellation_date'):
+            search_data['cancellation_date'] = detail_data['cancellation_date']
+        # If detail page has better effective date, use it
+        if detail_data.get('effective_date'):
+            search_data['effective_date'] = detail_data['effective_date']
+
     def get_application_details(self, app_id: str) -> Dict:
         """Get additional details from the detail page (effective/expiration/cancellation dates)"""
         if not self.authenticated:
             raise Exception("Must login first")
         
+        cached = self._cache_get(self._detail_cache, app_id)
+        if cached is not None:
+            return cached
+        
         try:
-            detail_url = f"https://isc.onlinemga.com/amp/detail/view/{app_id}"
+            detail_url = DETAIL_URL.format(app_id=app_id)
             
             # This is exactly like browser.get(url) in MechanicalSoup!
-            response = self.session.get(detail_url)
+            self._throttle()
+            response = self.session.get(detail_url, timeout=REQUEST_TIMEOUT)
             
             if response.status_code == 200:
-                return self._parse_detail_page_html(response.text)
+                details = self._parse_detail_page_html(response.text)
+                self._cache_put(self._detail_cache, app_id, details)
+                return details
             
             return {}
             
@@ -243,103 +743,374 @@ class ISCRequestsHybrid:
             logging.error(f"Detail page retrieval failed for {app_id}: {e}")
             return {}
 
-    def process_policies_concurrent(self, policy_numbers: List[str], max_workers: int = 10, progress_callback=None) -> List[Dict]:
+    def process_policies_concurrent(self, policy_numbers: List[str], max_workers: int = 10, progress_callback=None, batch_search: bool = True) -> List[Dict]:
         """Process multiple policies concurrently using ThreadPoolExecutor"""
         
-        print(f"🚀 Processing {len(policy_numbers)} policies with {max_workers} threads...")
+        _progress_log.info(f"🚀 Processing {len(policy_numbers)} policies with {max_workers} threads...")
         start_time = time.time()
+        self._details_skipped = 0
+        # Successes are sampled down to ~100 lines per batch; failures are always reported
+        report_every = max(1, len(policy_numbers) // 100)
         
         results = []
         successful = 0
         failed = 0
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all tasks
-            future_to_policy = {
-                executor.submit(self.process_policy, policy): policy 
-                for policy in policy_numbers
-            }
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        # Set when a stuck policy was given up on - its thread may never return, so don't wait for it at the end
+        abandoned = False
+        try:
+            future_to_policy = {}
+            prefetched = set()
             
-            # Collect results as they complete
-            for i, future in enumerate(future_to_policy):
-                policy = future_to_policy[future]
-                try:
-                    result = future.result()
-                    if result:
-                        results.append(result)
-                        successful += 1
-                        company = result.get('applicant_company', 'N/A')
-                        status = result.get('status', 'N/A')
-                        print(f"  ✅ {i+1}/{len(policy_numbers)}: {policy} - {company} ({status})")
-                    else:
+            # Batched searches first; each batch's detail fetches start while the next batch is searched
+            if batch_search:
+                for found in self._iter_batch_searches(policy_numbers):
+                    for policy, search_data in found.items():
+                        future_to_policy[executor.submit(self.process_policy, policy, search_data)] = policy
+                    prefetched.update(found)
+                if prefetched:
+                    _progress_log.info(f"🔎 Batch search found {len(prefetched)}/{len(policy_numbers)} policies")
+            
+            # Anything the batches missed (or repeats of a policy) gets the full search + detail treatment
+            for policy in policy_numbers:
+                if policy in prefetched:
+                    prefetched.discard(policy)
+                    continue
+                future_to_policy[executor.submit(self.process_policy, policy)] = policy
+            
+            # Collect results in the order they finish so one slow policy never holds back the rest
+            i = 0
+            pending = set(future_to_policy)
+            while pending:
+                done, pending = wait(pending, timeout=POLICY_TIMEOUT, return_when=FIRST_COMPLETED)
+                if not done:
+                    # Nothing finished for POLICY_TIMEOUT seconds, so no worker picked up anything new either:
+                    # every policy still running has been stuck at least that long - count them as failed
+                    stalled = {future for future in pending if future.running()}
+                    pending -= stalled
+                    abandoned = abandoned or bool(stalled)
+                    for future in stalled:
                         failed += 1
-                        print(f"  ❌ {i+1}/{len(policy_numbers)}: {policy} - Not found")
+                        i += 1
+                        _progress_log.info(f"  ❌ {i}/{len(policy_numbers)}: {future_to_policy[future]} - Timed out after {POLICY_TIMEOUT}s")
+                        if progress_callback:
+                            progress_callback(i, len(policy_numbers), successful, failed)
+                    continue
+                
+                for future in done:
+                    policy = future_to_policy[future]
+                    i += 1
+                    try:
+                        result = future.result()
+                        if result:
+                            results.append(result)
+                            successful += 1
+                            company = result.get('applicant_company', 'N/A')
+                            status = result.get('status', 'N/A')
+                            if i % report_every == 0 or i == len(policy_numbers):
+                                _progress_log.info(f"  ✅ {i}/{len(policy_numbers)}: {policy} - {company} ({status})")
+                        else:
+                            failed += 1
+                            _progress_log.info(f"  ❌ {i}/{len(policy_numbers)}: {policy} - Not found")
                     
-                    # Call progress callback if provided
-                    if progress_callback:
-                        progress_callback(i + 1, len(policy_numbers), successful, failed)
+                        # Call progress callback if provided
+                        if progress_callback:
+                            progress_callback(i, len(policy_numbers), successful, failed)
                         
+                    except Exception as e:
+                        failed += 1
+                        _progress_log.info(f"  ❌ {i}/{len(policy_numbers)}: {policy} - Error: {e}")
+                        if progress_callback:
+                            progress_callback(i, len(policy_numbers), successful, failed)
+        except KeyboardInterrupt:
+            # Drop everything still queued; only the requests already in flight finish
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            executor.shutdown(wait=not abandoned)
+        
+        self._save_app_id_cache()
+        
+        elapsed = time.time() - start_time
+        _progress_log.info(f"\n🎯 Completed: {successful}/{len(policy_numbers)} policies in {elapsed:.2f}s")
+        if self._details_skipped:
+            _progress_log.info(f"⏭️ Skipped {self._details_skipped} detail pages the search results already covered")
+        _progress_log.info(f"📊 Average: {elapsed/len(policy_numbers):.2f}s per policy")
+        _progress_log.info(f"💡 That's {len(policy_numbers)*60/elapsed:.0f} policies per minute!")
+        _progress_handler.flush()
+        
+        return results
+    
+    def _get_async_client(self, max_workers: int = 10) -> httpx.AsyncClient:
+        """HTTP/2 client sharing the logged-in cookies/headers, built once and reused for every batch"""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                http2=True,
+                cookies=self.session.cookies,
+                headers=dict(self.session.headers),
+                limits=httpx.Limits(max_connections=max_workers, max_keepalive_connections=max_workers),
+                timeout=REQUEST_TIMEOUT
+            )
+        return self._async_client
+
+    async def _with_retries_async(self, label: str, attempt):
+        """Run `attempt()` -> (status_code, result), retrying transport errors and throttling
+        responses with exponential backoff (1s, 2s, ...) and reporting every status to the AIMD limiter"""
+        for n in range(ASYNC_ATTEMPTS):
+            last = n == ASYNC_ATTEMPTS - 1
+            try:
+                status_code, result = await attempt()
+            except httpx.TransportError as e:
+                if last:
+                    raise
+                reason = type(e).__name__
+            else:
+                if self._aimd is not None:
+                    await self._aimd.record(status_code)
+                if status_code not in THROTTLE_STATUSES or last:
+                    return status_code, result
+                reason = f"HTTP {status_code}"
+            delay = min(10, 2 ** n)
+            logging.warning(f"{label}: {reason}, retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+    async def search_by_policy_async(self, policy_number: str) -> Optional[Dict]:
+        """Async version of search_by_policy over the shared HTTP/2 client"""
+        if not self.authenticated:
+            raise Exception("Must login first")
+        
+        cached = self._cache_get(self._search_cache, policy_number)
+        if cached is not None:
+            return cached
+        
+        try:
+            client = self._get_async_client()
+            
+            async def attempt():
+                await self._throttle_async()
+                scanner = _SearchRowScanner(policy_number)
+                # Leaving the stream early just resets this HTTP/2 stream - the connection stays up
+                async with client.stream('GET', SEARCH_URL, params=self._build_search_params(policy_number)) as response:
+                    if response.status_code == 200:
+                        async for chunk in response.aiter_bytes(64 * 1024):
+                            if scanner.feed(chunk):
+                                break
+                return response.status_code, (scanner, response.encoding)
+            
+            status_code, (scanner, encoding) = await self._with_retries_async(f"Search for {policy_number}", attempt)
+            if status_code == 200:
+                data = self._extract_search_results_data(scanner.html(encoding), policy_number)
+                if data:
+                    self._app_ids[policy_number] = data['app_id']
+                    self._cache_put(self._search_cache, policy_number, data)
+                return data
+            
+            return None
+            
+        except Exception as e:
+            logging.error(f"Search failed for {policy_number}: {e}")
+            return None
+
+    async def get_application_details_async(self, app_id: str) -> Dict:
+        """Async version of get_application_details over the shared HTTP/2 client"""
+        if not self.authenticated:
+            raise Exception("Must login first")
+        
+        cached = self._cache_get(self._detail_cache, app_id)
+        if cached is not None:
+            return cached
+        
+        try:
+            client = self._get_async_client()
+            
+            async def attempt():
+                await self._throttle_async()
+                response = await client.get(DETAIL_URL.format(app_id=app_id))
+                return response.status_code, response
+            
+            status_code, response = await self._with_retries_async(f"Detail page {app_id}", attempt)
+            if status_code == 200:
+                details = self._parse_detail_page_html(response.text)
+                self._cache_put(self._detail_cache, app_id, details)
+                return details
+            
+            return {}
+            
+        except Exception as e:
+            logging.error(f"Detail page retrieval failed for {app_id}: {e}")
+            return {}
+
+    async def process_policy_async(self, policy_number: str, fetch_detail='auto') -> Optional[Dict]:
+        """Async version of process_policy - search results data then detail page data"""
+        try:
+            known_app_id = self._app_ids.get(policy_number)
+            # Speculating on the detail page only pays off when it will almost certainly be wanted
+            if known_app_id and (fetch_detail is True or (fetch_detail == 'auto' and self.needs_expiration)):
+                # Seen on an earlier run - fetch the detail page alongside the search instead of after it
+                search_data, detail_data = await asyncio.gather(
+                    self.search_by_policy_async(policy_number),
+                    self.get_application_details_async(known_app_id)
+                )
+            else:
+                search_data, detail_data = await self.search_by_policy_async(policy_number), None
+            if not search_data:
+                return None
+            
+            app_id = search_data.get('app_id')
+            if app_id and (detail_data is not None or self._should_fetch_detail(search_data, fetch_detail)):
+                if detail_data is None or app_id != known_app_id:
+                    detail_data = await self.get_application_details_async(app_id)
+                self._merge_detail_data(search_data, detail_data)
+            
+            return search_data
+            
+        except Exception as e:
+            logging.error(f"Error processing policy {policy_number}: {e}")
+            return None
+
+    async def process_policies_concurrent_async(self, policy_numbers: List[str], max_workers: int = 10, progress_callback=None, on_result=None) -> List[Dict]:
+        """Process multiple policies on one event loop, reporting them in the order they finish
+        (with `on_result`, every policy is handed to it as (policy, record or None) instead of collected)"""
+        
+        _progress_log.info(f"🚀 Processing {len(policy_numbers)} policies with {max_workers} concurrent requests...")
+        start_time = time.time()
+        self._details_skipped = 0
+        # Successes are sampled down to ~100 lines per batch; failures are always reported
+        report_every = max(1, len(policy_numbers) // 100)
+        
+        self._get_async_client(max_workers)
+        # Starts at max_workers; 429/503s halve it and every 20 clean responses win one slot back
+        self._aimd = _AIMDLimiter(max_workers)
+        
+        async def _bounded(policy: str):
+            async with self._aimd:
+                try:
+                    return policy, await self.process_policy_async(policy)
                 except Exception as e:
+                    # Anything escaping process_policy_async costs this one policy, never its siblings
+                    logging.error(f"Error processing policy {policy}: {e}")
+                    return policy, None
+        
+        tasks = [asyncio.create_task(_bounded(policy)) for policy in policy_numbers]
+        
+        results = []
+        successful = 0
+        failed = 0
+        
+        # as_completed yields in finish order, so one slow policy never holds back the others
+        try:
+            for i, coro in enumerate(asyncio.as_completed(tasks)):
+                policy, result = await coro
+                if on_result:
+                    on_result(policy, result)
+                if result:
+                    if not on_result:
+                        results.append(result)
+                    successful += 1
+                    company = result.get('applicant_company', 'N/A')
+                    status = result.get('status', 'N/A')
+                    if (i + 1) % report_every == 0 or i + 1 == len(policy_numbers):
+                        _progress_log.info(f"  ✅ {i+1}/{len(policy_numbers)}: {policy} - {company} ({status})")
+                else:
                     failed += 1
-                    print(f"  ❌ {i+1}/{len(policy_numbers)}: {policy} - Error: {e}")
-                    if progress_callback:
-                        progress_callback(i + 1, len(policy_numbers), successful, failed)
+                    _progress_log.info(f"  ❌ {i+1}/{len(policy_numbers)}: {policy} - Not found")
+
+                if progress_callback:
+                    progress_callback(i + 1, len(policy_numbers), successful, failed)
+        finally:
+            # Leaving early (Ctrl+C, a Streamlit rerun raising out of the callback) must not leave requests running
+            for task in tasks:
+                task.cancel()
+            self._aimd = None
+
+        await asyncio.to_thread(self._save_app_id_cache)
         
         elapsed = time.time() - start_time
-        print(f"\n🎯 Completed: {successful}/{len(policy_numbers)} policies in {elapsed:.2f}s")
-        print(f"📊 Average: {elapsed/len(policy_numbers):.2f}s per policy")
-        print(f"💡 That's {len(policy_numbers)*60/elapsed:.0f} policies per minute!")
+        _progress_log.info(f"\n🎯 Completed: {successful}/{len(policy_numbers)} policies in {elapsed:.2f}s")
+        if self._details_skipped:
+            _progress_log.info(f"⏭️ Skipped {self._details_skipped} detail pages the search results already covered")
+        _progress_handler.flush()
         
         return results
+
+    async def aclose(self):
+        """Close the shared async client (the requests session needs no cleanup)"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
     
+    def _iter_result_rows(self, html: str) -> List[tuple]:
+        """Every search results row as (app_id, cleaned cell texts)"""
+        try:
+            parser, result_rows = _lxml_tools()
+            tree = lxml_html.fromstring(html, parser=parser)
+            return [
+                (row.get('data-id'), [' '.join(td.text_content().split()) for td in row.findall('td')])
+                for row in result_rows(tree)
+            ]
+        except Exception as e:
+            logging.warning(f"lxml could not parse search results, falling back to regex: {e}")
+        
+        return [
+            (row_match.group(1), [self._clean_cell_text(cell) for cell in _TD_RE.findall(row_match.group(2))])
+            for row_match in _ROW_RE.finditer(html)
+        ]
+
+    def _find_result_row(self, html: str, policy_number: str) -> Optional[tuple]:
+        """Locate the search results row for a policy, returning (app_id, cleaned cell texts)"""
+        for app_id, cells in self._iter_result_rows(html):
+            if policy_number in ' '.join(cells):
+                return app_id, cells
+        return None
+
+    def _row_to_data(self, policy_number: str, app_id: str, cells: List[str]) -> Dict:
+        """Map a results row onto our output fields"""
+        # Initialize data with what we know
+        data = {
+            'policy_number': policy_number,
+            'app_id': app_id,
+            'status': '',
+            'applicant_company': '',
+            'state': '',
+            'program': '',
+            'total_cost': '',
+            'effective_date': ''
+        }
+        
+        # Extract data from table cells based on actual column structure
+        if len(cells) >= 9:
+            # [0]Empty, [1]App ID, [2]Policy, [3]Status, [4]Company, [5]State, [6]Program, [7]Cost, [8]Effective Date
+            data['status'] = cells[3]
+            data['applicant_company'] = cells[4]
+            data['state'] = cells[5]
+            data['program'] = cells[6]
+            data['total_cost'] = cells[7]
+            data['effective_date'] = cells[8]
+        elif len(cells) >= 8:
+            # Fallback for slightly different table structure
+            data['status'] = cells[3]
+            data['applicant_company'] = cells[4]
+            data['state'] = cells[5]
+            data['program'] = cells[6]
+            data['total_cost'] = cells[7]
+        
+        return data
+
     def _extract_search_results_data(self, html: str, policy_number: str) -> Optional[Dict]:
         """Extract data from search results table based on actual HTML structure"""
         try:
             # Find the table row for this policy
-            # Look for a row that contains the policy number (HTML uses single quotes!)
-            row_pattern = rf"<tr[^>]*class='[^']*itemRow[^']*'[^>]*data-id='(\d+)'[^>]*>.*?{re.escape(policy_number)}.*?</tr>"
-            row_match = re.search(row_pattern, html, re.DOTALL)
+            row = self._find_result_row(html, policy_number)
             
-            if not row_match:
+            if not row:
                 logging.warning(f"No search results found for policy {policy_number}")
                 return None
             
-            app_id = row_match.group(1)
-            row_html = row_match.group(0)
-            
-            # Extract data from table columns based on actual structure
+            # Cells follow the actual table structure
             # [0]Empty, [1]App ID, [2]Policy, [3]Status, [4]Applicant Company, [5]State, [6]Program, [7]Total Cost, [8]Effective Date
-            td_pattern = r'<td[^>]*>(.*?)</td>'
-            cells = re.findall(td_pattern, row_html, re.DOTALL)
-            
-            # Initialize data with what we know
-            data = {
-                'policy_number': policy_number,
-                'app_id': app_id,
-                'status': '',
-                'applicant_company': '',
-                'state': '',
-                'program': '',
-                'total_cost': '',
-                'effective_date': ''
-            }
-            
-            # Extract data from table cells based on actual column structure
-            if len(cells) >= 9:
-                # [0]Empty, [1]App ID, [2]Policy, [3]Status, [4]Company, [5]State, [6]Program, [7]Cost, [8]Effective Date
-                data['status'] = self._clean_cell_text(cells[3])
-                data['applicant_company'] = self._clean_cell_text(cells[4])
-                data['state'] = self._clean_cell_text(cells[5])
-                data['program'] = self._clean_cell_text(cells[6])
-                data['total_cost'] = self._clean_cell_text(cells[7])
-                data['effective_date'] = self._clean_cell_text(cells[8])
-            elif len(cells) >= 8:
-                # Fallback for slightly different table structure
-                data['status'] = self._clean_cell_text(cells[3])
-                data['applicant_company'] = self._clean_cell_text(cells[4])
-                data['state'] = self._clean_cell_text(cells[5])
-                data['program'] = self._clean_cell_text(cells[6])
-                data['total_cost'] = self._clean_cell_text(cells[7])
+            app_id, cells = row
+            data = self._row_to_data(policy_number, app_id, cells)
             
             logging.info(f"Extracted search data for {policy_number}: {data}")
             return data
@@ -348,51 +1119,55 @@ class ISCRequestsHybrid:
             logging.error(f"Error extracting search results for {policy_number}: {e}")
             return None
 
+    def _extract_all_search_results(self, html: str, policy_numbers: List[str]) -> Dict[str, Dict]:
+        """Extract every requested policy from a multi-policy results page"""
+        wanted = set(policy_numbers)
+        found = {}
+        for app_id, cells in self._iter_result_rows(html):
+            # The policy cell can list several numbers, e.g. "SCB-GL-000078314,ISCCX03000006434"
+            row_policies = cells[2].replace(',', ' ').split() if len(cells) > 2 else []
+            for policy_number in row_policies:
+                if policy_number in wanted and policy_number not in found:
+                    found[policy_number] = self._row_to_data(policy_number, app_id, cells)
+        return found
+
     def _clean_cell_text(self, cell_html: str) -> str:
         """Clean HTML from table cell and extract text"""
-        # Remove HTML tags and clean up text
-        text = re.sub(r'<[^>]+>', '', cell_html)
-        text = text.replace('&nbsp;', ' ')
-        # Remove extra whitespace and newlines
-        text = ' '.join(text.split())
-        return text.strip()
+        # Drop tags and decode entities, then collapse whitespace and newlines
+        return ' '.join(_CELL_MARKUP_RE.sub(_cell_markup_sub, cell_html).split())
 
     def _parse_detail_page_html(self, html: str) -> Dict:
         """Parse detail page for expiration and cancellation dates (search results gives us effective date)"""
         details = {}
         
         try:
-            # Extract cancellation date if present (same as original scraper)
-            cancellation_pattern = r'Cancellation Date:\s*</dt>\s*<dd[^>]*>\s*(\d{2}/\d{2}/\d{4})'
-            cancellation_match = re.search(cancellation_pattern, html, re.DOTALL)
-            if cancellation_match:
-                details['cancellation_date'] = cancellation_match.group(1).strip()
-                logging.info(f"Found cancellation date: {details['cancellation_date']}")
-            else:
+            # Single pass for the cancellation date and the policy term (Method 1)
+            for match in _DETAIL_RE.finditer(html):
+                if match.group('cancel') and 'cancellation_date' not in details:
+                    details['cancellation_date'] = match.group('cancel_date')
+                    logging.info(f"Found cancellation date: {details['cancellation_date']}")
+                elif match.group('term') and 'expiration_date' not in details:
+                    # We prefer the more detailed effective/expiration dates from detail page over search results
+                    details['effective_date'] = match.group('start')
+                    details['expiration_date'] = match.group('end')
+                    logging.info(f"Found policy term (method 1): {details['effective_date']} - {details['expiration_date']}")
+                if 'cancellation_date' in details and 'expiration_date' in details:
+                    break
+            
+            if 'cancellation_date' not in details:
                 # Alternative pattern for different HTML structures
-                alt_cancellation_pattern = r'Cancellation Date:\s*</dt>\s*<dd[^>]*>([^<]+)</dd>'
-                alt_match = re.search(alt_cancellation_pattern, html, re.DOTALL)
+                alt_match = _CANCEL_ALT_RE.search(html)
                 if alt_match:
-                    cancellation_text = alt_match.group(1).strip()
-                    date_in_text = re.search(r'(\d{2}/\d{2}/\d{4})', cancellation_text)
+                    date_in_text = _DATE_RE.search(alt_match.group(1))
                     if date_in_text:
                         details['cancellation_date'] = date_in_text.group(1)
                         logging.info(f"Found cancellation date (alt): {details['cancellation_date']}")
             
-            # Extract policy term dates for expiration date (we already have effective from search results)
-            # Method 1: Primary regex - Policy Term with date range pattern
-            date_pattern = r'Policy Term:.*?(\d{2}/\d{2}/\d{4})\s*-\s*(\d{2}/\d{2}/\d{4})'
-            match = re.search(date_pattern, html, re.DOTALL)
-            if match:
-                # We prefer the more detailed effective/expiration dates from detail page over search results
-                details['effective_date'] = match.group(1).strip()
-                details['expiration_date'] = match.group(2).strip()
-                logging.info(f"Found policy term (method 1): {details['effective_date']} - {details['expiration_date']}")
+            if 'expiration_date' in details:
                 return details
             
             # Method 2: Alternative HTML structure regex
-            alt_pattern = r'<dt[^>]*>Policy Term:</dt>\s*<dd[^>]*>([^<]+)</dd>'
-            match = re.search(alt_pattern, html, re.DOTALL)
+            match = _TERM_ALT_RE.search(html)
             if match:
                 term_text = match.group(1).strip()
                 logging.info(f"Found policy term text (method 2): {term_text}")
@@ -404,29 +1179,23 @@ class ISCRequestsHybrid:
                     return details
             
             # Method 3: General date range pattern search
-            general_date_pattern = r'(\d{2}/\d{2}/\d{4})\s*-\s*(\d{2}/\d{2}/\d{4})'
-            matches = re.findall(general_date_pattern, html)
+            matches = _DATE_RANGE_RE.findall(html)
             if matches:
                 logging.info(f"Found {len(matches)} date ranges in detail page")
                 # Take the first reasonable match for policy terms
-                for i, match in enumerate(matches):
-                    try:
-                        from datetime import datetime
-                        start_date = datetime.strptime(match[0], '%m/%d/%Y')
-                        end_date = datetime.strptime(match[1], '%m/%d/%Y')
-                        
-                        # Basic validation for policy terms
-                        current_year = datetime.now().year
-                        if (start_date.year >= current_year - 1 and 
-                            end_date.year <= current_year + 2 and 
-                            end_date > start_date):
-                            details['effective_date'] = match[0]
-                            details['expiration_date'] = match[1]
-                            logging.info(f"Found valid policy term (method 3): {details['effective_date']} - {details['expiration_date']}")
-                            return details
-                    except Exception as date_error:
-                        logging.warning(f"Date validation failed for match {i+1}: {date_error}")
-                        continue
+                current_year = time.localtime().tm_year
+                for start, end in matches:
+                    start_key, end_key = date_key(start), date_key(end)
+                    
+                    # Basic validation for policy terms
+                    if (start_key and end_key and
+                        start_key[0] >= current_year - 1 and
+                        end_key[0] <= current_year + 2 and
+                        end_key > start_key):
+                        details['effective_date'] = start
+                        details['expiration_date'] = end
+                        logging.info(f"Found valid policy term (method 3): {details['effective_date']} - {details['expiration_date']}")
+                        return details
             
             # If we didn't find expiration date, at least return what we found
             if not details.get('expiration_date'):
@@ -1,17 +1,138 @@
 import asyncio
+import httpx
+import json
 import logging
 from playwright.async_api import async_playwright
 import pandas as pd
 from typing import List, Dict, Optional
+import os
 import re
+import time
+from lxml import html as lxml_html
+
+# Package import for the app and tests, plain import for the scripts run from inside src/
+try:
+    from src.utils import SEARCH_PARAMS, date_key
+except ImportError:
+    from utils import SEARCH_PARAMS, date_key
+
+SITE_ORIGIN = "https://isc.onlinemga.com"
+SEARCH_URL = "https://isc.onlinemga.com/amp/search/advancedsearch"
+DETAIL_URL = "https://isc.onlinemga.com/amp/detail/view/{app_id}"
+
+# Detail page patterns, compiled once for every policy
+_CANCEL_RE = re.compile(r'Cancellation Date:\s*</dt>\s*<dd[^>]*>\s*(\d{2}/\d{2}/\d{4})', re.DOTALL)
+_CANCEL_ALT_RE = re.compile(r'Cancellation Date:\s*</dt>\s*<dd[^>]*>([^<]+)</dd>', re.DOTALL)
+_DATE_IN_TEXT_RE = re.compile(r'(\d{2}/\d{2}/\d{4})')
+# Any date range, with group 1 set when "Policy Term:" leads up to it. The gap is capped (the <dd> follows
+# right after the label) so a label without dates can't drag the lazy match across the rest of the page
+_TERM_ANY_RE = re.compile(r'(Policy Term:.{0,300}?)?(\d{2}/\d{2}/\d{4})\s*-\s*(\d{2}/\d{2}/\d{4})', re.DOTALL)
+_ALT_TERM_RE = re.compile(r'<dt[^>]*>Policy Term:</dt>\s*<dd[^>]*>([^<]+)</dd>', re.DOTALL)
+_GENERAL_DATE_RE = re.compile(r'(\d{2}/\d{2}/\d{4})\s*-\s*(\d{2}/\d{2}/\d{4})')
+
+def _detail_block(page_content: str) -> str:
+    """The <dt>/<dd> run holding the detail labels, so the fallback regexes scan ~1KB instead of the whole page"""
+    starts = [pos for pos in (page_content.find(label) for label in DETAIL_LABELS) if pos != -1]
+    if not starts:
+        return page_content
+    start = page_content.rfind('<dt', 0, min(starts))
+    end = page_content.find('</dl>', max(starts))
+    if start == -1 or end == -1:
+        return page_content
+    return page_content[start:end + 5]
+
+# Subresources the scraper never reads - aborted so pages settle sooner
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'font', 'stylesheet', 'media'})
+BLOCKED_URL_PARTS = ('analytics', 'googletag', 'doubleclick')
+
+async def _block_unneeded_requests(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(part in request.url for part in BLOCKED_URL_PARTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+DETAIL_LABELS = ('Policy Term:', 'Cancellation Date:')
+DETAIL_FIELDS_SELECTOR = 'dt:has-text("Policy Term:") + dd, dt:has-text("Cancellation Date:") + dd'
+
+# Search results HTML fetched from inside a tab, so it goes out with the page's cookies
+_SEARCH_FETCH_JS = """async ([url, params]) => {
+    const response = await fetch(url + '?' + new URLSearchParams(params), {credentials: 'same-origin'});
+    if (!response.ok) throw new Error(`Search returned HTTP ${response.status}`);
+    return await response.text();
+}"""
+
+# Same lookup as detail_fields_from_html, run inside the browser so only the field texts cross CDP
+_DETAIL_FIELDS_JS = """(labels) => {
+    const out = {};
+    for (const dt of document.querySelectorAll('dt')) {
+        const label = dt.textContent.trim();
+        if (!labels.includes(label) || label in out) continue;
+        let dd = dt.nextElementSibling;
+        while (dd && dd.tagName !== 'DD') dd = dd.nextElementSibling;
+        if (dd) out[label] = dd.textContent.trim();
+    }
+    return out;
+}"""
+
+def detail_fields_from_html(page_content) -> Dict[str, str]:
+    """Text of the <dd> that follows each detail label, looked up by node instead of scanning the page"""
+    tree = lxml_html.fromstring(page_content)
+    fields = {}
+    for label in DETAIL_LABELS:
+        dd = tree.xpath(f'//dt[normalize-space()="{label}"]/following-sibling::dd[1]')
+        if dd:
+            fields[label] = dd[0].text_content().strip()
+    return fields
+
+def search_row_from_html(page_content, policy_number: str) -> Optional[Dict]:
+    """Search results row for a policy as a dict, None if the page has no such row"""
+    tree = lxml_html.fromstring(page_content)
+    for row in tree.xpath("//tr[contains(concat(' ', normalize-space(@class), ' '), ' itemRow ')][@data-id]"):
+        if policy_number not in row.text_content():
+            continue
+        cells = [' '.join(td.text_content().split()) for td in row.findall('td')]
+        cells += [''] * (9 - len(cells))
+        # [0]Empty, [1]App ID, [2]Policy, [3]Status, [4]Company, [5]State, [6]Program, [7]Cost, [8]Effective Date
+        return {
+            'policy_number': policy_number,
+            'app_id': row.get('data-id'),
+            'status': cells[3],
+            'applicant_company': cells[4],
+            'state': cells[5],
+            'program': cells[6],
+            'total_cost': cells[7],
+            'effective_date': cells[8]
+        }
+    return None
+
+def dates_from_detail_fields(fields: Dict[str, str]) -> Dict:
+    """Effective/expiration/cancellation dates from the label -> text pairs of a detail page"""
+    details = {}
+    cancellation = _DATE_IN_TEXT_RE.search(fields.get('Cancellation Date:', ''))
+    if cancellation:
+        details['cancellation_date'] = cancellation.group(1)
+    term = _GENERAL_DATE_RE.search(fields.get('Policy Term:', ''))
+    if term:
+        details['effective_date'], details['expiration_date'] = term.groups()
+    return details
 
 class ISCScraper:
-    def __init__(self, username: str, password: str, headless: bool = True):
+    def __init__(self, username: str, password: str, headless: bool = True, storage_state_path: Optional[str] = None):
         self.username = username
         self.password = password
         self.headless = headless
+        # Optional file to persist the logged-in session (cookies/localStorage) between runs
+        self.storage_state_path = storage_state_path
+        self._restored_state = False
         self.browser = None
+        self.context = None
         self.page = None
+        # Plain HTTP client on the browser's session, for the *_fast methods
+        self._client = None
+        self._search_rows = {}
+        # Extra pages on the same context for concurrent browser searches
+        self._pages = None
         
     async def initialize(self):
         """Initialize browser and create page"""
@@ -21,10 +142,14 @@ class ISCScraper:
                 headless=self.headless,
                 args=['--no-sandbox', '--disable-dev-shm-usage']  # Better for Windows
             )
-            self.page = await self.browser.new_page()
-            # Set reasonable timeouts
-            self.page.set_default_timeout(30000)  # 30 seconds
-            self.page.set_default_navigation_timeout(30000)
+            # One context for the whole run - the main page and every pooled page share its cookies,
+            # so the login (or a restored saved session) is attached once
+            saved_state = self._load_saved_state()
+            self._restored_state = saved_state is not None
+            self.context = await self.browser.new_context(storage_state=saved_state)
+            # Registered on the context so the main page and every pooled page get it
+            await self.context.route("**/*", _block_unneeded_requests)
+            self.page = await self._new_page()
         except Exception as e:
             logging.error(f"Failed to initialize browser: {e}")
             await self.close()
@@ -32,388 +157,375 @@ class ISCScraper:
     
 
         
+    async def _new_page(self):
+        """Page on the shared context (so it carries the login) with our default timeouts"""
+        page = await self.context.new_page()
+        # Set reasonable timeouts
+        page.set_default_timeout(30000)  # 30 seconds
+        page.set_default_navigation_timeout(30000)
+        return page
+
+    async def _init_pool(self, size: int = 4):
+        """Pre-open `size` pages so concurrent searches don't pay for page creation each time"""
+        self._pages = asyncio.Queue()
+        for page in await asyncio.gather(*[self._new_page() for _ in range(size)]):
+            self._pages.put_nowait(page)
+
+    async def _acquire_page(self):
+        return await self._pages.get()
+
+    def _release_page(self, page):
+        self._pages.put_nowait(page)
+
+    async def search_policies(self, policy_numbers: List[str], pool_size: int = 4) -> List[Optional[Dict]]:
+        """Browser search for many policies, `pool_size` at a time (results in input order)"""
+        if self._pages is None:
+            await self._init_pool(pool_size)
+        
+        async def search_one(policy_number: str) -> Optional[Dict]:
+            page = await self._acquire_page()
+            try:
+                return await self.search_policy(policy_number, page=page)
+            finally:
+                self._release_page(page)
+        
+        return await asyncio.gather(*[search_one(p) for p in policy_numbers])
+
+    def _load_saved_state(self) -> Optional[Dict]:
+        """Saved browser session from an earlier run - only if it was saved for this username"""
+        if not self.storage_state_path:
+            return None
+        try:
+            with open(self.storage_state_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if saved.get('username') != self.username:
+            return None
+        return {'cookies': saved.get('cookies', []), 'origins': saved.get('origins', [])}
+
+    async def _save_state(self):
+        """Write the session to disk with its username (owner-only permissions - it grants account access)"""
+        state = await self.context.storage_state()
+        try:
+            fd = os.open(self.storage_state_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'username': self.username, **state}, f)
+            # O_CREAT's mode doesn't apply to a file left by an older run
+            os.chmod(self.storage_state_path, 0o600)
+        except OSError as e:
+            logging.warning(f"Could not save session state: {e}")
+
+    async def _session_is_valid(self) -> bool:
+        """Cheap probe: a saved session is valid if the search page answers 200 without redirecting to login"""
+        try:
+            response = await self.page.request.head(SEARCH_URL, max_redirects=0)
+            return response.status == 200
+        except Exception as e:
+            logging.warning(f"Session probe failed: {e}")
+            return False
+
     async def login(self) -> bool:
-        """Login to ISC platform"""
+        """Login to ISC platform (skipped when a saved session is still valid)"""
         try:
+            if self._restored_state:
+                if await self._session_is_valid():
+                    logging.info(f"Reusing saved session from {self.storage_state_path}")
+                    await self._create_http_client()
+                    return True
+                logging.info("Saved session expired, logging in again")
+            
             await self.page.goto("https://isc.onlinemga.com/amp/login")
             await self.page.fill('input[name="username"]', self.username)
             await self.page.fill('input[name="password"]', self.password)
-            await self.page.click('button.btn.btn-lg.btn-block.btn-default[type="submit"]')
             
-            # Wait for redirect and validate
-            await self.page.wait_for_load_state("networkidle")
-            return "login" not in self.page.url
+            # The form post redirects either way - to the app on success, back to the login page on failure -
+            # so the navigation itself is the signal; no need to wait for the network to go idle
+            async with self.page.expect_navigation(wait_until="domcontentloaded", timeout=15000):
+                await self.page.click('button.btn.btn-lg.btn-block.btn-default[type="submit"]')
+            if "login" in self.page.url:
+                return False
+            
+            # Persist the session so the next run can skip this round trip
+            if self.storage_state_path:
+                await self._save_state()
+            await self._create_http_client()
+            return True
             
         except Exception as e:
             logging.error(f"Login failed: {e}")
             return False
 
-    async def search_policy(self, policy_number: str) -> Optional[Dict]:
-        """Search for a policy by number and extract data from search results"""
-        max_retries = 2
-        row = None
-        
-        for attempt in range(max_retries + 1):
-            try:
-                # Navigate to search page with timeout
-                await self.page.goto("https://isc.onlinemga.com/amp/search/advancedsearch", timeout=30000)
-                await self.page.fill('input[name="policy_number"]', policy_number)
-                await self.page.click('button.submitAdvancedSearch.btn.btn-green.btn-success')
-                
-                # Wait for results
-                await self.page.wait_for_load_state("networkidle", timeout=30000)
-                
-                # Wait for and find the matching row
-                row = await self.page.query_selector(f'tr.itemRow:has-text("{policy_number}")')
-                if not row:
-                    logging.warning(f"No results found for policy {policy_number}")
-                    return None
-                
-                break  # Success, exit retry loop
-                
-            except Exception as e:
-                if attempt < max_retries:
-                    logging.warning(f"Attempt {attempt + 1} failed for {policy_number}: {e}. Retrying...")
-                    await asyncio.sleep(1)  # Brief delay before retry
-                    continue
-                else:
-                    logging.error(f"All attempts failed for policy {policy_number}: {e}")
-                    return None
+    async def _create_http_client(self):
+        """HTTP/2 client carrying the browser session's cookies - search and detail pages need no JS"""
+        jar = httpx.Cookies()
+        for cookie in await self.context.cookies():
+            jar.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie.get('path', '/'))
+        user_agent = await self.page.evaluate("navigator.userAgent")
+        if self._client:
+            await self._client.aclose()
+        # Detail pages multiplex over a few kept-alive HTTP/2 connections instead of one browser navigation each
+        self._client = httpx.AsyncClient(http2=True, cookies=jar, headers={'User-Agent': user_agent}, timeout=15,
+                                         limits=httpx.Limits(max_keepalive_connections=20))
+
+    async def _fetch_detail(self, app_id: str) -> Optional[bytes]:
+        """Raw detail page over the HTTP client, None unless it answered 200 (a login redirect isn't followed)"""
+        response = await self._client.get(DETAIL_URL.format(app_id=app_id))
+        if response.status_code != 200:
+            logging.warning("Detail page for %s returned HTTP %s", app_id, response.status_code)
+            return None
+        return response.content
+
+    async def search_by_policy_fast(self, policy_number: str) -> Optional[str]:
+        """Search over plain HTTP and return the policy's app_id (row data is kept for get_application_fast)"""
+        if not self._client:
+            raise Exception("Must login first")
         
         try:
-            # Extract data from the row
-            app_id = await row.get_attribute('data-id')
-            status = await row.query_selector('td:nth-child(4)')
-            status_text = await status.text_content() if status else ""
-            
-            company = await row.query_selector('td:nth-child(5)')
-            company_text = await company.text_content() if company else ""
-            
-            state = await row.query_selector('td:nth-child(6)')
-            state_text = await state.text_content() if state else ""
-            
-            program = await row.query_selector('td:nth-child(7)')
-            program_text = await program.text_content() if program else ""
+            response = await self._client.get(SEARCH_URL, params={**SEARCH_PARAMS, 'policy_number': policy_number})
+            if response.status_code != 200:
+                logging.warning("Search for %s returned HTTP %s", policy_number, response.status_code)
+                return None
             
-            cost = await row.query_selector('td:nth-child(8)')
-            cost_text = await cost.text_content() if cost else ""
+            row = search_row_from_html(response.content, policy_number)
+            if not row:
+                logging.warning("No results found for policy %s", policy_number)
+                return None
             
-            # Navigate directly to the detail page using app_id
-            detail_url = f"https://isc.onlinemga.com/amp/detail/view/{app_id}"
-            logging.info(f"Navigating to detail page: {detail_url}")
-            await self.page.goto(detail_url)
-            await self.page.wait_for_load_state("networkidle")
+            self._search_rows[row['app_id']] = row
+            return row['app_id']
             
-            # Verify we're on the detail page
-            current_url = self.page.url
-            logging.info(f"Current URL after navigation: {current_url}")
-            
-            if "detail/view" not in current_url:
-                logging.warning(f"Failed to navigate to detail page. Current URL: {current_url}")
-                details = {}
-            else:
-                # Extract additional details from the detail page
-                details = await self.extract_policy_details()
+        except Exception as e:
+            logging.error("Fast search failed for %s: %s", policy_number, e)
+            return None
+
+    async def get_application_fast(self, app_id: str) -> Optional[Dict]:
+        """Detail page over plain HTTP, merged with the search row - same fields as search_policy"""
+        if not self._client:
+            raise Exception("Must login first")
+        
+        try:
+            page_content = await self._fetch_detail(app_id)
+            if page_content is None:
+                return None
             
-            # Combine search results with detail page data
+            details = dates_from_detail_fields(detail_fields_from_html(page_content))
+            row = self._search_rows.get(app_id, {'app_id': app_id})
             return {
-                'policy_number': policy_number,
-                'app_id': app_id,
-                'status': status_text.strip(),
-                'applicant_company': company_text.strip(),
-                'state': state_text.strip(),
-                'program': program_text.strip(),
-                'total_cost': cost_text.strip(),
-                'effective_date': details.get('effective_date', ''),
+                **row,
+                'effective_date': details.get('effective_date', row.get('effective_date', '')),
                 'expiration_date': details.get('expiration_date', ''),
                 'cancellation_date': details.get('cancellation_date', '')
             }
             
         except Exception as e:
-            logging.error(f"Search failed for policy {policy_number}: {e}")
+            logging.error("Fast detail retrieval failed for %s: %s", app_id, e)
             return None
 
-    async def extract_policy_details(self) -> Dict:
-        """Extract detailed policy information from the detail page"""
-        try:
-            details = {}
-            
-            # Wait for page to be fully loaded - be more patient
-            await self.page.wait_for_load_state("networkidle")
-            await self.page.wait_for_timeout(2000)  # Additional wait for dynamic content
-            
-            # Get the full page content
-            page_content = await self.page.content()
-            logging.info(f"Page content length: {len(page_content)} characters")
-            
-            # Extract cancellation date if present (check for cancelled policies)
-            cancellation_pattern = r'Cancellation Date:\s*</dt>\s*<dd[^>]*>\s*(\d{2}/\d{2}/\d{4})'
-            cancellation_match = re.search(cancellation_pattern, page_content, re.DOTALL)
-            if cancellation_match:
-                details['cancellation_date'] = cancellation_match.group(1).strip()
-                logging.info(f"Extracted cancellation date: {details['cancellation_date']}")
-            else:
-                # Alternative pattern for different HTML structures
-                alt_cancellation_pattern = r'Cancellation Date:\s*</dt>\s*<dd[^>]*>([^<]+)</dd>'
-                alt_match = re.search(alt_cancellation_pattern, page_content, re.DOTALL)
-                if alt_match:
-                    cancellation_text = alt_match.group(1).strip()
-                    # Extract date from the text (in case there's extra whitespace or formatting)
-                    date_in_text = re.search(r'(\d{2}/\d{2}/\d{4})', cancellation_text)
-                    if date_in_text:
-                        details['cancellation_date'] = date_in_text.group(1)
-                        logging.info(f"Extracted cancellation date (alternative): {details['cancellation_date']}")
-            
-            # Method 1: Primary regex - Policy Term with date pattern (PROVEN TO WORK)
-            date_pattern = r'Policy Term:.*?(\d{2}/\d{2}/\d{4})\s*-\s*(\d{2}/\d{2}/\d{4})'
-            match = re.search(date_pattern, page_content, re.DOTALL)
-            if match:
-                details['effective_date'] = match.group(1).strip()
-                details['expiration_date'] = match.group(2).strip()
-                logging.info(f"Method 1 - Extracted dates via Policy Term regex: {details}")
-                return details
-            
-            # Method 2: Alternative HTML structure regex (PROVEN TO WORK)
-            alt_pattern = r'<dt[^>]*>Policy Term:</dt>\s*<dd[^>]*>([^<]+)</dd>'
-            match = re.search(alt_pattern, page_content, re.DOTALL)
-            if match:
-                term_text = match.group(1).strip()
-                logging.info(f"Method 2 - Found policy term text: {term_text}")
-                
-                # Extract dates from the text
-                dates = [date.strip() for date in term_text.split('-')]
-                if len(dates) == 2:
-                    details['effective_date'] = dates[0].strip()
-                    details['expiration_date'] = dates[1].strip()
-                    logging.info(f"Method 2 - Extracted dates from HTML: {details}")
-                    return details
-            
-            # Method 3: General date pattern search (PROVEN TO WORK)
-            general_date_pattern = r'(\d{2}/\d{2}/\d{4})\s*-\s*(\d{2}/\d{2}/\d{4})'
-            matches = re.findall(general_date_pattern, page_content)
-            if matches:
-                logging.info(f"Method 3 - Found {len(matches)} date ranges")
-                # Take the first reasonable match
-                for i, match in enumerate(matches):
-                    try:
-                        from datetime import datetime
-                        start_date = datetime.strptime(match[0], '%m/%d/%Y')
-                        end_date = datetime.strptime(match[1], '%m/%d/%Y')
-                        
-                        # Basic validation
-                        current_year = datetime.now().year
-                        if (start_date.year >= current_year - 1 and 
-                            end_date.year <= current_year + 2 and 
-                            end_date > start_date):
-                            details['effective_date'] = match[0]
-                            details['expiration_date'] = match[1]
-                            logging.info(f"Method 3 - Extracted dates via general pattern (match {i+1}): {details}")
-                            return details
-                    except Exception as date_error:
-                        logging.warning(f"Date validation failed for match {i+1}: {date_error}")
-                        continue
-            
-            # Debug: Log if we find Policy Term text at all
-            if 'Policy Term:' in page_content:
-                start_pos = page_content.find('Policy Term:')
-                context = page_content[start_pos:start_pos+200]
-                logging.warning(f"Found 'Policy Term:' in content but couldn't extract dates. Context: {context[:100]}...")
-            else:
-                logging.warning("'Policy Term:' text not found in page content at all")
-            
-            logging.warning("Could not extract policy term dates with any method")
-            return details
-            
-        except Exception as e:
-            logging.error(f"Detail extraction failed: {e}")
-            return {}
-
-    async def search_policy_with_page(self, policy_number: str, page) -> Optional[Dict]:
-        """Search for a policy using a specific page (for concurrent operations)"""
+    async def search_policy(self, policy_number: str, *, page=None) -> Optional[Dict]:
+        """Search for a policy by number and extract data from search results (on `page` for concurrent operations)"""
+        # Concurrent callers bring their own page and get more patient retries
+        concurrent = page is not None
+        page = page or self.page
         max_retries = 2
         row = None
         
         for attempt in range(max_retries + 1):
             try:
-                # Navigate to search page with longer timeout for concurrent operations
-                await page.goto("https://isc.onlinemga.com/amp/search/advancedsearch", timeout=30000)
-                await page.fill('input[name="policy_number"]', policy_number)
-                await page.click('button.submitAdvancedSearch.btn.btn-green.btn-success')
+                # The search is a plain GET - fetch it from inside the tab (same cookies) instead of loading
+                # and re-rendering the search page. A fresh pooled page only needs to reach the site once.
+                if not page.url.startswith(SITE_ORIGIN):
+                    await page.goto(SEARCH_URL, timeout=30000, wait_until="domcontentloaded")
+                page_content = await page.evaluate(_SEARCH_FETCH_JS, [SEARCH_URL, {**SEARCH_PARAMS, 'policy_number': policy_number}])
                 
-                # Wait for results with longer timeout for concurrent operations
-                await page.wait_for_load_state("networkidle", timeout=20000)
-                
-                # Wait for and find the matching row
-                row = await page.query_selector(f'tr.itemRow:has-text("{policy_number}")')
+                row = search_row_from_html(page_content, policy_number)
                 if not row:
-                    logging.warning(f"No results found for policy {policy_number}")
+                    logging.warning("No results found for policy %s", policy_number)
                     return None
                 
                 break  # Success, exit retry loop
                 
             except Exception as e:
                 if attempt < max_retries:
-                    logging.warning(f"Attempt {attempt + 1} failed for {policy_number}: {e}. Retrying...")
-                    await asyncio.sleep(3)  # Longer delay before retry for concurrent operations
+                    logging.warning("Attempt %s failed for %s: %s. Retrying...", attempt + 1, policy_number, e)
+                    await asyncio.sleep(3 if concurrent else 1)  # Brief delay before retry
                     continue
                 else:
-                    logging.error(f"All attempts failed for policy {policy_number}: {e}")
+                    logging.error("All attempts failed for policy %s: %s", policy_number, e)
                     return None
         
         try:
-            # Extract data from the row
-            app_id = await row.get_attribute('data-id')
-            status = await row.query_selector('td:nth-child(4)')
-            status_text = await status.text_content() if status else ""
-            
-            company = await row.query_selector('td:nth-child(5)')
-            company_text = await company.text_content() if company else ""
-            
-            state = await row.query_selector('td:nth-child(6)')
-            state_text = await state.text_content() if state else ""
-            
-            program = await row.query_selector('td:nth-child(7)')
-            program_text = await program.text_content() if program else ""
+            app_id = row['app_id']
             
-            cost = await row.query_selector('td:nth-child(8)')
-            cost_text = await cost.text_content() if cost else ""
-            
-            # Navigate directly to the detail page using app_id
-            detail_url = f"https://isc.onlinemga.com/amp/detail/view/{app_id}"
-            logging.info(f"Navigating to detail page: {detail_url}")
-            await page.goto(detail_url)
-            await page.wait_for_load_state("networkidle")
-            
-            # Verify we're on the detail page
-            current_url = page.url
-            logging.info(f"Current URL after navigation: {current_url}")
-            
-            if "detail/view" not in current_url:
-                logging.warning(f"Failed to navigate to detail page. Current URL: {current_url}")
-                details = {}
-            else:
-                # Extract additional details from the detail page
-                details = await self.extract_policy_details_from_page(page)
+            # Logged in: the detail page is static HTML, so fetch it over HTTP rather than navigating the tab
+            details = {}
+            if self._client:
+                try:
+                    page_content = await self._fetch_detail(app_id)
+                    if page_content is not None:
+                        details = dates_from_detail_fields(detail_fields_from_html(page_content))
+                except Exception as fetch_error:
+                    logging.warning("HTTP detail fetch failed for %s, using the browser: %s", app_id, fetch_error)
+            
+            if 'expiration_date' not in details:
+                # Navigate directly to the detail page using app_id
+                detail_url = DETAIL_URL.format(app_id=app_id)
+                logging.info("Navigating to detail page: %s", detail_url)
+                await page.goto(detail_url, wait_until="domcontentloaded")
+                
+                # Verify we're on the detail page
+                current_url = page.url
+                logging.info("Current URL after navigation: %s", current_url)
+                
+                if "detail/view" not in current_url:
+                    logging.warning("Failed to navigate to detail page. Current URL: %s", current_url)
+                    details = {}
+                else:
+                    # Extract additional details from the detail page
+                    details = await self.extract_policy_details(page)
             
             # Combine search results with detail page data
             return {
-                'policy_number': policy_number,
-                'app_id': app_id,
-                'status': status_text.strip(),
-                'applicant_company': company_text.strip(),
-                'state': state_text.strip(),
-                'program': program_text.strip(),
-                'total_cost': cost_text.strip(),
+                **row,
                 'effective_date': details.get('effective_date', ''),
                 'expiration_date': details.get('expiration_date', ''),
                 'cancellation_date': details.get('cancellation_date', '')
             }
             
         except Exception as e:
-            logging.error(f"Search failed for policy {policy_number}: {e}")
+            logging.error("Search failed for policy %s: %s", policy_number, e)
             return None
 
-    async def extract_policy_details_from_page(self, page) -> Dict:
-        """Extract detailed policy information from a specific page (for concurrent operations)"""
+    async def extract_policy_details(self, page=None) -> Dict:
+        """Extract detailed policy information from the detail page (on `page` for concurrent operations)"""
+        page = page or self.page
         try:
             details = {}
             
-            # Wait for page to be fully loaded - be more patient
-            await page.wait_for_load_state("networkidle")
-            await page.wait_for_timeout(2000)  # Additional wait for dynamic content
+            # The caller navigated with domcontentloaded; wait for the fields themselves - pages missing both fall through to the fallbacks
+            try:
+                await page.wait_for_selector(DETAIL_FIELDS_SELECTOR, timeout=8000)
+            except Exception:
+                logging.warning("Detail fields did not appear, trying the full page content")
+            
+            # Ask the browser for just the labelled fields instead of serializing the whole DOM
+            try:
+                details = dates_from_detail_fields(await page.evaluate(_DETAIL_FIELDS_JS, list(DETAIL_LABELS)))
+            except Exception as eval_error:
+                logging.warning("Detail field lookup failed, falling back to page content: %s", eval_error)
+            if 'expiration_date' in details:
+                logging.info("Extracted dates from detail fields: %s", details)
+                return details
             
             # Get the full page content
             page_content = await page.content()
-            logging.info(f"Page content length: {len(page_content)} characters")
+            logging.debug("Page content length: %d characters", len(page_content))
+            
+            # Read the labelled fields off the parsed DOM; the regexes below are only a fallback
+            try:
+                details = dates_from_detail_fields(detail_fields_from_html(page_content))
+            except Exception as parse_error:
+                logging.warning("lxml could not parse detail page, falling back to regex: %s", parse_error)
+            if 'expiration_date' in details:
+                logging.info("Extracted dates from detail fields: %s", details)
+                return details
+            
+            # Both labels sit in one small block - the label regexes only need to look there
+            block = _detail_block(page_content)
             
             # Extract cancellation date if present (check for cancelled policies)
-            cancellation_pattern = r'Cancellation Date:\s*</dt>\s*<dd[^>]*>\s*(\d{2}/\d{2}/\d{4})'
-            cancellation_match = re.search(cancellation_pattern, page_content, re.DOTALL)
+            cancellation_match = _CANCEL_RE.search(block)
             if cancellation_match:
                 details['cancellation_date'] = cancellation_match.group(1).strip()
-                logging.info(f"Extracted cancellation date: {details['cancellation_date']}")
+                logging.info("Extracted cancellation date: %s", details['cancellation_date'])
             else:
                 # Alternative pattern for different HTML structures
-                alt_cancellation_pattern = r'Cancellation Date:\s*</dt>\s*<dd[^>]*>([^<]+)</dd>'
-                alt_match = re.search(alt_cancellation_pattern, page_content, re.DOTALL)
+                alt_match = _CANCEL_ALT_RE.search(block)
                 if alt_match:
                     cancellation_text = alt_match.group(1).strip()
                     # Extract date from the text (in case there's extra whitespace or formatting)
-                    date_in_text = re.search(r'(\d{2}/\d{2}/\d{4})', cancellation_text)
+                    date_in_text = _DATE_IN_TEXT_RE.search(cancellation_text)
                     if date_in_text:
                         details['cancellation_date'] = date_in_text.group(1)
-                        logging.info(f"Extracted cancellation date (alternative): {details['cancellation_date']}")
-            
-            # Method 1: Primary regex - Policy Term with date pattern (PROVEN TO WORK)
-            date_pattern = r'Policy Term:.*?(\d{2}/\d{2}/\d{4})\s*-\s*(\d{2}/\d{2}/\d{4})'
-            match = re.search(date_pattern, page_content, re.DOTALL)
-            if match:
-                details['effective_date'] = match.group(1).strip()
-                details['expiration_date'] = match.group(2).strip()
-                logging.info(f"Method 1 - Extracted dates via Policy Term regex: {details}")
-                return details
+                        logging.info("Extracted cancellation date (alternative): %s", details['cancellation_date'])
+            
+            # Methods 1 and 3 share one scan: a range introduced by "Policy Term:" wins outright,
+            # bare date ranges before it are kept for the general fallback
+            matches = []
+            for match in _TERM_ANY_RE.finditer(block):
+                if match.group(1):
+                    details['effective_date'] = match.group(2)
+                    details['expiration_date'] = match.group(3)
+                    logging.info("Method 1 - Extracted dates via Policy Term regex: %s", details)
+                    return details
+                matches.append(match.group(2, 3))
             
             # Method 2: Alternative HTML structure regex (PROVEN TO WORK)
-            alt_pattern = r'<dt[^>]*>Policy Term:</dt>\s*<dd[^>]*>([^<]+)</dd>'
-            match = re.search(alt_pattern, page_content, re.DOTALL)
+            match = _ALT_TERM_RE.search(block)
             if match:
                 term_text = match.group(1).strip()
-                logging.info(f"Method 2 - Found policy term text: {term_text}")
+                logging.info("Method 2 - Found policy term text: %s", term_text)
                 
                 # Extract dates from the text
                 dates = [date.strip() for date in term_text.split('-')]
                 if len(dates) == 2:
                     details['effective_date'] = dates[0].strip()
                     details['expiration_date'] = dates[1].strip()
-                    logging.info(f"Method 2 - Extracted dates from HTML: {details}")
+                    logging.info("Method 2 - Extracted dates from HTML: %s", details)
                     return details
             
-            # Method 3: General date pattern search (PROVEN TO WORK)
-            general_date_pattern = r'(\d{2}/\d{2}/\d{4})\s*-\s*(\d{2}/\d{2}/\d{4})'
-            matches = re.findall(general_date_pattern, page_content)
+            # Method 3: General date pattern search (PROVEN TO WORK) - over the whole page when only a block was scanned
+            if block is not page_content:
+                matches = _GENERAL_DATE_RE.findall(page_content)
             if matches:
-                logging.info(f"Method 3 - Found {len(matches)} date ranges")
-                # Take the first reasonable match
-                for i, match in enumerate(matches):
-                    try:
-                        from datetime import datetime
-                        start_date = datetime.strptime(match[0], '%m/%d/%Y')
-                        end_date = datetime.strptime(match[1], '%m/%d/%Y')
-                        
-                        # Basic validation
-                        current_year = datetime.now().year
-                        if (start_date.year >= current_year - 1 and 
-                            end_date.year <= current_year + 2 and 
-                            end_date > start_date):
-                            details['effective_date'] = match[0]
-                            details['expiration_date'] = match[1]
-                            logging.info(f"Method 3 - Extracted dates via general pattern (match {i+1}): {details}")
-                            return details
-                    except Exception as date_error:
-                        logging.warning(f"Date validation failed for match {i+1}: {date_error}")
-                        continue
-            
-            # Debug: Log if we find Policy Term text at all
-            if 'Policy Term:' in page_content:
+                logging.info("Method 3 - Found %d date ranges", len(matches))
+                # Take the first reasonable match - plain integer checks on the fixed MM/DD/YYYY slices
+                current_year = time.localtime().tm_year
+                min_year, max_year = current_year - 1, current_year + 2
+                for i, (start, end) in enumerate(matches):
+                    start_key, end_key = date_key(start), date_key(end)
+                    
+                    # Basic validation
+                    if (start_key and end_key and
+                        start_key[0] >= min_year and
+                        end_key[0] <= max_year and
+                        end_key > start_key):
+                        details['effective_date'] = start
+                        details['expiration_date'] = end
+                        logging.info("Method 3 - Extracted dates via general pattern (match %d): %s", i + 1, details)
+                        return details
+            
+            # Debug: Log if we find Policy Term text at all (only worth the extra scan when someone is reading)
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
                 start_pos = page_content.find('Policy Term:')
-                context = page_content[start_pos:start_pos+200]
-                logging.warning(f"Found 'Policy Term:' in content but couldn't extract dates. Context: {context[:100]}...")
-            else:
-                logging.warning("'Policy Term:' text not found in page content at all")
+                if start_pos != -1:
+                    logging.debug("Found 'Policy Term:' in content but couldn't extract dates. Context: %s...", page_content[start_pos:start_pos+100])
+                else:
+                    logging.debug("'Policy Term:' text not found in page content at all")
             
             logging.warning("Could not extract policy term dates with any method")
             return details
             
         except Exception as e:
-            logging.error(f"Detail extraction failed: {e}")
+            logging.error("Detail extraction failed: %s", e)
             return {}
 
     async def close(self):
         """Clean up browser resources"""
         try:
+            if self._client:
+                await self._client.aclose()
+                self._client = None
             if self.page:
                 await self.page.close()
                 self.page = None
+            if self._pages:
+                while not self._pages.empty():
+                    await self._pages.get_nowait().close()
+                self._pages = None
+            if self.context:
+                await self.context.close()
+                self.context = None
             if self.browser:
                 await self.browser.close()
                 self.browser = None
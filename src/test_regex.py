@@ -1,35 +1,39 @@
 import re
+from lxml import html as lxml_html
+
+# Search results rows with an app_id - libxml2 walks the page once instead of regex + find per row
+_ROWS_XPATH = "//tr[contains(concat(' ', normalize-space(@class), ' '), ' itemRow ')][@data-id]"
+
+# RE2 (linear time, same as the scraper's hot path) for the whole-page scan when it is installed
+try:
+    import re2 as _regex
+except ImportError:
+    _regex = re
+
+# Debug patterns, compiled once up front
+_DATA_ID_RE = re.compile(r"data-id='(\d+)'")
+_TR_RE = _regex.compile(rb'<tr[^>]*class="[^"]*itemRow[^"]*"[^>]*data-id="(\d+)"')
 
 # Test the improved regex pattern
-with open('debug_response_SCB_GL_000078314.html', 'r', encoding='utf-8') as f:
-    content = f.read()
+with open('debug_response_SCB_GL_000078314.html', 'rb') as f:
+    html_bytes = f.read()
+# The debug scans below run on these raw bytes too - no second, decoded copy of the page
 
 policy_number = 'SCB-GL-000078314'
+policy_bytes = policy_number.encode()
 
-def extract_app_id_from_search_results(html_content: str, policy_number: str):
+def extract_app_id_from_search_results(html_bytes: bytes, policy_number: str):
     """Test the new extraction method"""
-    # First, find all TR elements with data-id
-    tr_pattern = r'<tr[^>]*class="[^"]*itemRow[^"]*"[^>]*data-id=\'(\d+)\'[^>]*>'
-    tr_matches = re.finditer(tr_pattern, html_content, re.IGNORECASE)
-    
-    for match in tr_matches:
-        app_id = match.group(1)
-        tr_start = match.end()
-        
-        # Look for the closing </tr> to define the row content
-        tr_end = html_content.find('</tr>', tr_start)
-        if tr_end == -1:
-            continue
-            
+    tree = lxml_html.fromstring(html_bytes)
+    for row in tree.xpath(_ROWS_XPATH):
         # Check if this row contains our policy number
-        row_content = html_content[tr_start:tr_end]
-        if policy_number in row_content:
-            return app_id
+        if policy_number in row.text_content():
+            return row.get('data-id')
     
     return None
 
 # Test the function
-result = extract_app_id_from_search_results(content, policy_number)
+result = extract_app_id_from_search_results(html_bytes, policy_number)
 
 if result:
     print(f'✅ SUCCESS! New pattern found app_id: {result}')
@@ -39,42 +43,61 @@ else:
     print('❌ New pattern still failed')
     
     # Debug what we find
-    tr_pattern = r'<tr[^>]*class="[^"]*itemRow[^"]*"[^>]*data-id=\'(\d+)\'[^>]*>'
-    all_matches = re.findall(tr_pattern, content, re.IGNORECASE)
+    all_matches = [row.get('data-id') for row in lxml_html.fromstring(html_bytes).xpath(_ROWS_XPATH)]
     print(f'Found {len(all_matches)} TR elements: {all_matches}')
 
-# Debug: Find the exact line with our policy number
-lines = content.split('\n')
+def _line_bounds(text: bytes, pos: int):
+    """Start/end offsets of the line containing pos"""
+    line_end = text.find(b'\n', pos)
+    return text.rfind(b'\n', 0, pos) + 1, len(text) if line_end == -1 else line_end
+
+# Debug: Find the exact line with our policy number - walked with find() instead of splitting the whole page into lines
 policy_line = None
-for i, line in enumerate(lines):
-    if policy_number in line and 'searchResultHighlight' in line:
-        policy_line = i
-        print(f"Found policy at line {i}:")
+idx = html_bytes.find(policy_bytes)
+while idx != -1:
+    line_start, line_end = _line_bounds(html_bytes, idx)
+    line = html_bytes[line_start:line_end].decode('utf-8')
+    if 'searchResultHighlight' in line:
+        policy_line = html_bytes.count(b'\n', 0, line_start)
+        print(f"Found policy at line {policy_line}:")
         print(f"  {line.strip()}")
         
-        # Show context around this line
+        # Show context around this line (5 before, 2 after)
         print("\nContext around policy line:")
-        for j in range(max(0, i-5), min(len(lines), i+3)):
-            marker = ">>> " if j == i else "    "
-            print(f"{marker}{j}: {lines[j].strip()}")
+        window_start = line_start
+        for _ in range(5):
+            if window_start == 0:
+                break
+            window_start = _line_bounds(html_bytes, window_start - 1)[0]
+        window_end = line_end
+        for _ in range(2):
+            if window_end == len(html_bytes):
+                break
+            window_end = _line_bounds(html_bytes, window_end + 1)[1]
+        first_line = policy_line - html_bytes.count(b'\n', window_start, line_start)
+        for j, context_line in enumerate(html_bytes[window_start:window_end].decode('utf-8').split('\n'), first_line):
+            marker = ">>> " if j == policy_line else "    "
+            print(f"{marker}{j}: {context_line.strip()}")
         break
+    idx = html_bytes.find(policy_bytes, line_end)
 
 if policy_line:
     # Look for the tr element before the policy line
     for i in range(policy_line, max(0, policy_line-10), -1):
-        if '<tr' in lines[i] and 'data-id' in lines[i]:
+        tr_line = html_bytes[line_start:line_end].decode('utf-8')
+        if '<tr' in tr_line and 'data-id' in tr_line:
             print(f"\nFound TR element at line {i}:")
-            print(f"  {lines[i].strip()}")
+            print(f"  {tr_line.strip()}")
             
             # Extract data-id with a simple pattern
-            data_id_match = re.search(r"data-id='(\d+)'", lines[i])
+            data_id_match = _DATA_ID_RE.search(tr_line)
             if data_id_match:
                 print(f"✅ SUCCESS! Found app_id: {data_id_match.group(1)}")
             break
+        line_start, line_end = _line_bounds(html_bytes, line_start - 1)
 
 # Debug: Show if we can find the pattern parts separately
-tr_pattern = r'<tr[^>]*class="[^"]*itemRow[^"]*"[^>]*data-id="(\d+)"'
-tr_matches = re.findall(tr_pattern, content)
+tr_matches = _TR_RE.findall(html_bytes)
 print(f'Found {len(tr_matches)} tr elements with itemRow class and data-id')
 if tr_matches:
     print(f'data-ids found: {tr_matches[:3]}') 
\ No newline at end of file
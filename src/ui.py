@@ -1,6 +1,9 @@
 import streamlit as st
 import pandas as pd
 import asyncio
+import csv
+import io
+import itertools
 import os
 import logging
 from pathlib import Path
@@ -8,17 +11,32 @@ import sys
 import time
 import platform
 import random
+import tempfile
 
 # Add src directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from src.requests_hybrid import ISCRequestsHybrid
-from src.utils import validate_csv_input, create_csv_template, merge_data, save_output_csv, prepare_input_dataframe
+from src.utils import validate_csv_input, create_csv_template, merge_data, save_output_bytes, save_output_parquet, prepare_input_dataframe, write_csv, EXPECTED_COLUMNS
 from dotenv import load_dotenv
 
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
 # Load environment variables
 load_dotenv()
 
+# With pyarrow installed, uploads are parsed by its multithreaded reader, and the policy-number cleanup
+# and the scraped text columns use Arrow-backed strings (contiguous buffers, C++ kernels)
+try:
+    import pyarrow  # noqa: F401
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+STRING_DTYPE = 'string[pyarrow]' if HAVE_PYARROW else 'string'
+
 # Session state will be initialized in main() function
 
 # Fun Mr. Robot–style status lines ⚡
@@ -34,77 +52,138 @@ HACK_MESSAGES = [
     "📂 Leaking files to darknet...",
     "✅ Rootkit installed. All your data are belong to us."
 ]
+# Shuffled once at import, then just cycled - no RNG call in the progress callback
+_HACK_CYCLE = itertools.cycle(random.sample(HACK_MESSAGES, len(HACK_MESSAGES)))
+
+# Seconds between progress widget updates during a run
+PROGRESS_UPDATE_INTERVAL = 0.1
+
+# Each run streams its scraped records to its own temp file here, then merges them with the uploaded CSV
+SCRAPED_RESULTS_DIR = os.path.join('data', 'output')
+
+# Streamlit reruns the whole script on every interaction - serialize each download once, not per rerun.
+# The CSV is written as encoded bytes straight into the buffer (no intermediate str), and cache_resource hands
+# the same buffer back by reference instead of unpickling a fresh copy of it on every rerun
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _to_csv_buffer(df: pd.DataFrame) -> io.BytesIO:
+    buf = io.BytesIO()
+    write_csv(df, buf)
+    return buf
+
+@st.cache_resource(show_spinner=False)
+def _template_csv_buffer() -> io.BytesIO:
+    return _to_csv_buffer(create_csv_template())
 
-async def process_data(scraper: ISCRequestsHybrid, df: pd.DataFrame, progress_bar, status_text, hack_text, batch_size: int = 5):
+def _read_upload(uploaded_file) -> pd.DataFrame:
+    """Uploaded CSV with every column kept (merge_data writes them all back out)"""
+    if HAVE_PYARROW:
+        try:
+            return pd.read_csv(uploaded_file, engine='pyarrow')
+        except ValueError as e:
+            # The pyarrow engine is stricter about ragged or oddly quoted files - let the C parser have a go
+            logging.warning(f"pyarrow could not read the upload, falling back to the C parser: {e}")
+            uploaded_file.seek(0)
+    return pd.read_csv(uploaded_file)
+
+@st.cache_data(show_spinner=False)
+def _load_saved_output(path: str, mtime: float) -> pd.DataFrame:
+    """Saved output file (Parquet or CSV), parsed once per file version (mtime is only there to key the cache)"""
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+async def process_data(scraper: ISCRequestsHybrid, df: pd.DataFrame, progress_bar, status_text, hack_text, concurrency_limit: int = 5):
     """Process dataframe with our new hybrid approach"""
-    results = []
     total_rows = len(df)
-    failed_policies = []
-    completed_count = 0
+    
+    # Each widget update is a websocket round trip - push at most ~10 a second, plus the final count
+    last_update = 0.0
     
     def update_progress(current, total, successful, failed):
         """Callback to update UI progress"""
-        nonlocal completed_count
-        completed_count = current
+        nonlocal last_update
+        now = time.monotonic()
+        if current < total and now - last_update < PROGRESS_UPDATE_INTERVAL:
+            return
+        last_update = now
         progress = current / total
         progress_bar.progress(min(progress, 1.0))
         status_text.text(f"Processed {current}/{total} policies (✅ {successful} found, ❌ {failed} failed)")
         if hack_text and current % 5 == 0:
-            hack_text.text(random.choice(HACK_MESSAGES))
+            hack_text.text(next(_HACK_CYCLE))
     
-    # Process in batches for better progress tracking
-    for i in range(0, total_rows, batch_size):
-        batch_end = min(i + batch_size, total_rows)
-        batch_df = df.iloc[i:batch_end]
-        
-        # Update progress and status
-        progress = i / total_rows
-        progress_bar.progress(progress)
-        status_text.text(f"Processing batch {i//batch_size + 1} of {(total_rows-1)//batch_size + 1} (policies {i+1}-{batch_end}/{total_rows})")
-        
-        # Fun hacking status update
-        if hack_text:
-            hack_text.text(random.choice(HACK_MESSAGES))
-        
-        # Process batch
-        batch_policies = batch_df['policy_number'].tolist()
-        batch_results = scraper.process_policies_concurrent(
-            batch_policies, 
-            max_workers=5,
-            progress_callback=update_progress
-        )
-        
-        # Track failed policies
-        successful_policies = {result.get('policy_number') for result in batch_results if result}
-        batch_failed = [p for p in batch_policies if p not in successful_policies]
-        failed_policies.extend(batch_failed)
+    # Every policy goes onto one event loop and one pooled HTTP/2 client, `concurrency_limit` in flight at a time -
+    # no batch barrier, so a slow policy never holds back the rest and progress moves as each one finishes
+    policies = df['policy_number'].tolist()
+    status_text.text(f"Processing {total_rows} policies ({concurrency_limit} at a time)")
+    if hack_text:
+        hack_text.text(next(_HACK_CYCLE))
+    
+    # Records go straight to disk as they complete - only the failed policy numbers are kept in memory.
+    # The file is private to this run (concurrent sessions must not share one) and removed once read back
+    os.makedirs(SCRAPED_RESULTS_DIR, exist_ok=True)
+    failed_policies = []
+    found = 0
+    f = tempfile.NamedTemporaryFile('w', newline='', encoding='utf-8', buffering=1 << 20,
+                                    dir=SCRAPED_RESULTS_DIR, prefix='scraped_', suffix='.csv', delete=False)
+    try:
+        with f:
+            writer = csv.DictWriter(f, fieldnames=EXPECTED_COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+            
+            def write_result(policy, result):
+                nonlocal found
+                if result is None:
+                    failed_policies.append(policy)
+                else:
+                    writer.writerow(result)
+                    found += 1
+            
+            # The HTTP/2 client stays open afterwards - the next run on this session reuses its connection
+            await scraper.process_policies_concurrent_async(
+                policies,
+                max_workers=concurrency_limit,
+                progress_callback=update_progress,
+                on_result=write_result
+            )
         
-        # Update results
-        results.extend(batch_results)
+        # Blank cells read back as missing, same as fields a record never had
+        results = pd.read_csv(f.name, dtype=STRING_DTYPE)
+    finally:
+        os.remove(f.name)
     
     # Final progress update
     progress_bar.progress(1.0)
-    status_text.text(f"Completed processing {total_rows} policies. Found {len(results)} results, {len(failed_policies)} failed.")
+    status_text.text(f"Completed processing {total_rows} policies. Found {found} results, {len(failed_policies)} failed.")
     
     if failed_policies:
         logging.warning(f"Failed to process {len(failed_policies)} policies: {failed_policies[:10]}...")  # Log first 10
     
     return results, failed_policies
 
-async def run_scraping_process(username: str, password: str, headless: bool, df: pd.DataFrame, progress_bar, status_text, hack_text, batch_size: int = 5, concurrency_limit: int = 3, use_concurrent: bool = True):
+async def run_scraping_process(username: str, password: str, headless: bool, df: pd.DataFrame, progress_bar, status_text, hack_text, concurrency_limit: int = 5, use_concurrent: bool = True):
     """Run the scraping process with our new hybrid approach"""
     try:
-        # Initialize scraper
-        scraper = ISCRequestsHybrid(username, password)
-        
-        # Login
-        status_text.text("🔐 Logging in...")
-        if not await scraper.login():
-            st.error("❌ Login failed. Please check your credentials.")
-            return [], []
+        # Reuse the client from an earlier run while its session lasts - same cookies, same warm connection pool
+        scraper = st.session_state.get('scraper')
+        if scraper is not None and (scraper.username, scraper.password) == (username, password) and scraper.session_valid():
+            status_text.text("🔐 Reusing logged-in session...")
+        else:
+            if scraper is not None:
+                await scraper.aclose()
+            
+            # Initialize scraper
+            scraper = ISCRequestsHybrid(username, password)
+            
+            # Login
+            status_text.text("🔐 Logging in...")
+            if not await scraper.login():
+                st.error("❌ Login failed. Please check your credentials.")
+                return [], []
+            st.session_state['scraper'] = scraper
         
         # Process data
-        return await process_data(scraper, df, progress_bar, status_text, hack_text, batch_size)
+        return await process_data(scraper, df, progress_bar, status_text, hack_text, concurrency_limit)
         
     except Exception as e:
         st.error(f"❌ Error during scraping: {str(e)}")
@@ -123,23 +202,27 @@ def main():
     
     # Try to load last results from file if session state is empty but file exists
     output_path = os.path.join('data', 'output', 'enriched_data.csv')
+    parquet_path = os.path.join('data', 'output', 'enriched_data.parquet')
     failed_path = os.path.join('data', 'output', 'failed_policies.csv')
     
     if st.session_state.last_results is None and os.path.exists(output_path):
         try:
-            # Load the last saved results
-            last_results_df = pd.read_csv(output_path)
+            # Load the last saved results - from the Parquet copy when it was written with this CSV
+            file_mod_time = os.path.getmtime(output_path)
+            if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= file_mod_time:
+                last_results_df = _load_saved_output(parquet_path, os.path.getmtime(parquet_path))
+            else:
+                last_results_df = _load_saved_output(output_path, file_mod_time)
             if len(last_results_df) > 0:
                 st.session_state.last_results = last_results_df
                 
                 # Try to load failed policies too
                 if os.path.exists(failed_path):
-                    failed_df = pd.read_csv(failed_path)
+                    failed_df = _load_saved_output(failed_path, os.path.getmtime(failed_path))
                     if 'policy_number' in failed_df.columns:
                         st.session_state.last_failed = failed_df['policy_number'].tolist()
                 
                 # Set approximate sync time from file modification
-                file_mod_time = os.path.getmtime(output_path)
                 st.session_state.last_sync_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(file_mod_time))
         except Exception as e:
             pass  # Silently fail, will show upload section instead
@@ -153,7 +236,6 @@ def main():
 
     # Optimised defaults (no user interaction required)
     headless = True  # always run headless for performance & stability
-    batch_size = 20  # sweet-spot between speed and server load
     use_concurrent = True  # our new approach is concurrent by default
     concurrency_limit = 5  # optimal for our hybrid approach
 
@@ -164,7 +246,7 @@ def main():
         # Single download button for all results
         st.download_button(
             label="⬇️ **Download Complete Results**",
-            data=st.session_state.last_results.to_csv(index=False),
+            data=_to_csv_buffer(st.session_state.last_results),
             file_name="enriched_data.csv",
             mime="text/csv",
             use_container_width=True
@@ -177,10 +259,9 @@ def main():
     
     # Template download
     if st.button("Download CSV Template"):
-        template = create_csv_template()
         st.download_button(
             label="Download Template",
-            data=template.to_csv(index=False),
+            data=_template_csv_buffer(),
             file_name="isc_template.csv",
             mime="text/csv"
         )
@@ -190,7 +271,7 @@ def main():
         if username and password and uploaded_file:
             try:
                 # Read and validate CSV
-                df = pd.read_csv(uploaded_file)
+                df = _read_upload(uploaded_file)
                 if not validate_csv_input(df):
                     st.error("Invalid CSV format. Please ensure your CSV has a 'policy_number' column.")
                     return
@@ -198,12 +279,12 @@ def main():
                 # Ensure all required columns exist, creating empty ones if missing
                 df = prepare_input_dataframe(df)
                 
-                # Preprocess policy numbers - clean whitespace and quotes
+                # Preprocess policy numbers - clean whitespace and quotes with the string kernels, then filter once
                 original_count = len(df)
-                df['policy_number'] = df['policy_number'].astype(str).str.strip().str.strip('"\'')
-                df = df[df['policy_number'].str.len() > 0]  # Remove empty rows
-                df = df[~df['policy_number'].isin(['nan', 'NaN', 'None'])]  # Remove invalid entries
-                df = df.drop_duplicates(subset=['policy_number'])  # Remove duplicates
+                policies = df['policy_number'].astype(STRING_DTYPE).str.strip().str.strip('"\'')
+                valid = (policies.str.len() > 0).fillna(False) & ~policies.isin(['nan', 'NaN', 'None'])  # Remove empty/invalid entries
+                valid &= ~policies.duplicated()  # Remove duplicates (first occurrence kept) in the same mask
+                df = df.loc[valid].assign(policy_number=policies[valid])
                 cleaned_count = len(df)
                 
                 if cleaned_count == 0:
@@ -225,11 +306,19 @@ def main():
                 if platform.system() == "Windows":
                     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
-                loop = asyncio.new_event_loop()
+                # One loop per browser session, kept across runs: the scraper's HTTP/2 client is bound to it.
+                # libuv-based where available - less scheduling overhead per request
+                loop = st.session_state.get('event_loop')
+                if loop is None or loop.is_closed():
+                    loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+                    st.session_state['event_loop'] = loop
                 asyncio.set_event_loop(loop)
 
-                progress_bar = st.progress(0)
-                status_text = st.empty()
+                # Progress widgets share one status container; its label and state report the outcome at the end
+                status_box = st.status("⚡ Processing policies...", expanded=True)
+                with status_box:
+                    progress_bar = st.progress(0)
+                    status_text = st.empty()
 
                 try:
                     # 🚀 Run the async scraping process
@@ -242,11 +331,11 @@ def main():
                             progress_bar,
                             status_text,
                             None,  # No hack text
-                            batch_size,
                             concurrency_limit,
                             use_concurrent,
                         )
                     )
+                    status_box.update(label=f"✅ Processed {cleaned_count} policies", state="complete", expanded=False)
 
                     # ⏱️ Compute performance metrics
                     elapsed = time.time() - start_time  # seconds
@@ -256,7 +345,7 @@ def main():
                     output_dir = os.path.join('data', 'output')
                     os.makedirs(output_dir, exist_ok=True)
                     
-                    if results:
+                    if len(results):
                         # Merge scraped results with original CSV to preserve all input rows
                         output_df = merge_data(df, results)
                         success_count = len(results)
@@ -265,8 +354,13 @@ def main():
                         output_df = df.copy()
                         success_count = 0
                     
+                    # Serialized once: the same cached buffer is written to disk and served by the download buttons
+                    csv_buffer = _to_csv_buffer(output_df)
                     output_path = os.path.join(output_dir, 'enriched_data.csv')
-                    if save_output_csv(output_df, output_path):
+                    if save_output_bytes(output_path, csv_buffer.getbuffer()):
+                        # Parquet copy for fast reloads in new sessions; the CSV stays the download format
+                        save_output_parquet(output_df, os.path.join(output_dir, 'enriched_data.parquet'))
+                        
                         # Store results in session state
                         st.session_state.last_results = output_df.copy()
                         st.session_state.last_failed = failed_policies if failed_policies else []
@@ -278,26 +372,28 @@ def main():
                         # Show download button immediately
                         st.download_button(
                             label="⬇️ **Download Complete Results**",
-                            data=output_df.to_csv(index=False),
+                            data=csv_buffer,
                             file_name="enriched_data.csv",
                             mime="text/csv",
                             use_container_width=True,
                             key="immediate_download"
                         )
                         
-                        # Save failed policies
+                        # Save failed policies - a one-column list, written with the csv module rather than a DataFrame
                         if failed_policies:
-                            failed_df = pd.DataFrame({'policy_number': failed_policies})
+                            failed_csv = io.StringIO()
+                            failed_writer = csv.writer(failed_csv, lineterminator='\n')
+                            failed_writer.writerow(['policy_number'])
+                            failed_writer.writerows([policy] for policy in failed_policies)
                             failed_path = os.path.join(output_dir, 'failed_policies.csv')
-                            save_output_csv(failed_df, failed_path)
+                            save_output_bytes(failed_path, failed_csv.getvalue().encode('utf-8'))
                             
                     else:
                         st.error("Failed to save results.")
                         
                 except Exception as e:
+                    status_box.update(label="❌ Processing failed", state="error")
                     st.error(f"❌ Error during processing: {str(e)}")
-                finally:
-                    loop.close()
                     
             except Exception as e:
                 st.error(f"❌ Error reading CSV: {str(e)}")
@@ -1,40 +1,63 @@
 import pandas as pd
 import os
-from typing import List, Dict
+from types import MappingProxyType
+from typing import Optional
+
+# All columns the scraper returns, in output order
+EXPECTED_COLUMNS = ('policy_number', 'app_id', 'status', 'applicant_company', 'state', 'program',
+                    'total_cost', 'effective_date', 'expiration_date', 'cancellation_date')
+
+# Advanced search query string with every filter blank (it's a GET request), shared by both scrapers.
+# Read-only so the per-policy copies can't leak into each other; policy_number is the key parameter
+SEARCH_PARAMS = MappingProxyType({
+    'status_id': '',
+    'program_name': '',
+    'effective_date_start': '',
+    'effective_date_end': '',
+    'bind_date_start': '',
+    'bind_date_end': '',
+    'created_date_start': '',
+    'created_date_end': '',
+    'ren': '',
+    'has_esign': '',
+    'has_endorsements': '',
+    'has_claim': '',
+    'has_certificate': '',
+    'item_id': '',
+    'policy_number': '',
+    'agency_name': '',
+    'company_name': '',
+    'applicant_first': '',
+    'applicant_last': '',
+    'applicant_phone': '',
+    'applicant_state': '',
+    'applicant_email': '',
+    'producer_first': '',
+    'producer_last': ''
+})
+
+CSV_CHUNK_ROWS = 10_000
+CSV_WRITE_BUFFER = 1 << 20
+
+def date_key(date: str) -> Optional[tuple]:
+    """(year, month, day) from an MM/DD/YYYY string for cheap comparisons, None if it can't be a date"""
+    month, day, year = int(date[0:2]), int(date[3:5]), int(date[6:10])
+    if 1 <= month <= 12 and 1 <= day <= 31:
+        return year, month, day
+    return None
 
 def validate_csv_input(df: pd.DataFrame) -> bool:
     """Validate input CSV format - only policy_number column required"""
-    try:
-        return 'policy_number' in df.columns
-    except Exception as e:
-        print(f"Error validating CSV: {e}")
-        return False
+    return 'policy_number' in df.columns
 
 def prepare_input_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     """Ensure all required columns exist in the input DataFrame, creating empty ones if missing"""
-    # Define all expected columns that the scraper will return
-    expected_columns = [
-        'policy_number',
-        'app_id', 
-        'status',
-        'applicant_company',
-        'state',
-        'program',
-        'total_cost',
-        'effective_date',
-        'expiration_date',
-        'cancellation_date'
-    ]
-    
-    # Create a copy to avoid modifying the original
-    result_df = df.copy()
-    
-    # Add any missing columns with empty string values
-    for column in expected_columns:
-        if column not in result_df.columns:
-            result_df[column] = ''
-    
-    return result_df
+    # Add any missing columns with empty string values - assign returns a new frame, so the original is untouched
+    present = set(df.columns)
+    missing = [column for column in EXPECTED_COLUMNS if column not in present]
+    if not missing:
+        return df.copy(deep=False)
+    return df.assign(**dict.fromkeys(missing, ''))
 
 def create_csv_template() -> pd.DataFrame:
     """Create downloadable CSV template - only policy_number required"""
@@ -43,45 +66,60 @@ def create_csv_template() -> pd.DataFrame:
     })
     return template
 
-def merge_data(original_df: pd.DataFrame, scraped_data: List[Dict]) -> pd.DataFrame:
-    """Merge original data with scraped results"""
+def merge_data(original_df: pd.DataFrame, scraped_df: pd.DataFrame) -> pd.DataFrame:
+    """Merge original data with the scraped records (one row per policy, as read back from a run's results file)"""
     try:
-        # Convert scraped data to DataFrame
-        scraped_df = pd.DataFrame(scraped_data)
-        
-        # Merge with original data
-        merged_df = pd.merge(
-            original_df,
-            scraped_df,
-            left_on='policy_number',
-            right_on='policy_number',
-            how='left',
-            suffixes=('_original', '_scraped')
-        )
-        
-        # For columns that exist in both DataFrames, prefer scraped data if it's not empty
+        # One record per policy so it can act as a lookup table
+        if scraped_df.empty:
+            return original_df
+        scraped_df = scraped_df.drop_duplicates(subset=['policy_number']).set_index('policy_number')
+
+        # Line the scraped records up with the original rows, then fill the whole frame in one pass:
+        # use scraped data if available, otherwise keep original
         # This handles cases where input CSV might have some data we want to preserve
-        for col in scraped_df.columns:
-            if col != 'policy_number' and f'{col}_original' in merged_df.columns and f'{col}_scraped' in merged_df.columns:
-                # Use scraped data if available, otherwise keep original
-                merged_df[col] = merged_df[f'{col}_scraped'].fillna(merged_df[f'{col}_original'])
-                # Drop the suffixed columns
-                merged_df.drop([f'{col}_original', f'{col}_scraped'], axis=1, inplace=True)
-            elif f'{col}_scraped' in merged_df.columns:
-                # If only scraped version exists, rename it
-                merged_df[col] = merged_df[f'{col}_scraped']
-                merged_df.drop(f'{col}_scraped', axis=1, inplace=True)
-        
-        return merged_df
+        scraped_df = scraped_df.reindex(original_df['policy_number']).set_axis(original_df.index)
+        merged_df = scraped_df.combine_first(original_df)
+
+        # combine_first sorts the column union - keep the input's columns first
+        new_columns = [col for col in scraped_df.columns if col not in original_df.columns]
+        return merged_df[[*original_df.columns, *new_columns]]
     except Exception as e:
         print(f"Error merging data: {e}")
         return original_df
 
+def write_csv(df: pd.DataFrame, destination) -> None:
+    """Write a DataFrame as CSV to a path or binary buffer - same bytes as df.to_csv(index=False)"""
+    if isinstance(destination, (str, os.PathLike)):
+        # Format in row chunks into a large write buffer so the whole CSV never sits in memory
+        with open(destination, 'wb', buffering=CSV_WRITE_BUFFER) as f:
+            df.to_csv(f, index=False, chunksize=CSV_CHUNK_ROWS)
+        return
+    df.to_csv(destination, index=False, chunksize=CSV_CHUNK_ROWS)
+
 def save_output_csv(df: pd.DataFrame, output_path: str) -> bool:
     """Save enriched data to CSV"""
     try:
-        df.to_csv(output_path, index=False)
+        write_csv(df, output_path)
         return True
     except Exception as e:
         print(f"Error saving CSV: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def save_output_bytes(output_path: str, data) -> bool:
+    """Save an already-encoded output file (e.g. a CSV serialized once for both disk and download)"""
+    try:
+        with open(output_path, 'wb') as f:
+            f.write(data)
+        return True
+    except Exception as e:
+        print(f"Error saving {output_path}: {e}")
+        return False
+
+def save_output_parquet(df: pd.DataFrame, output_path: str) -> bool:
+    """Save enriched data to zstd Parquet - typed and much faster to reload than the CSV (needs pyarrow)"""
+    try:
+        df.to_parquet(output_path, engine='pyarrow', compression='zstd', index=False)
+        return True
+    except Exception as e:
+        print(f"Error saving Parquet: {e}")
+        return False
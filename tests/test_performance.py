@@ -10,8 +10,9 @@ from datetime import datetime
 # Add src directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.scraper import ISCScraper
-from src.ui import process_data, process_data_concurrent
+from src.requests_hybrid import ISCRequestsHybrid
+from src.ui import process_data
+from src.utils import save_output_csv
 
 # Configure logging
 logging.basicConfig(
@@ -31,61 +32,57 @@ class DummyStatusText:
     def text(self, value):
         pass
 
-async def run_performance_test(username: str, password: str, test_policies: list, batch_size: int = 20, concurrency_limit: int = 4):
-    """Run performance test comparing sequential vs concurrent processing"""
-    
-    # Initialize scraper
-    scraper = ISCScraper(username=username, password=password, headless=True)
-    await scraper.initialize()
+async def run_performance_test(username: str, password: str, test_policies: list, concurrency_limit: int = 4):
+    """Run performance test comparing sequential (one at a time) vs concurrent processing"""
     
+    # Both runs share this logged-in scraper so the timings don't include a login
+    scraper = ISCRequestsHybrid(username=username, password=password, use_disk_cache=False)
     if not await scraper.login():
         logging.error("Login failed. Cannot proceed with tests.")
-        await scraper.close()
         return
     
     # Create test dataframe
     df = pd.DataFrame({'policy_number': test_policies})
     
-    # Test sequential processing
-    logging.info("Starting sequential processing test...")
-    start_time = time.time()
-    results_seq = await process_data(
-        scraper, 
-        df, 
-        DummyProgressBar(), 
-        DummyStatusText(), 
-        None, 
-        batch_size
-    )
-    seq_time = time.time() - start_time
-    
-    # Reset scraper for concurrent test
-    await scraper.close()
-    scraper = ISCScraper(username=username, password=password, headless=True)
-    await scraper.initialize()
-    await scraper.login()
-    
-    # Test concurrent processing
-    logging.info("Starting concurrent processing test...")
-    start_time = time.time()
-    results_conc = await process_data_concurrent(
-        scraper, 
-        df, 
-        DummyProgressBar(), 
-        DummyStatusText(), 
-        None, 
-        batch_size, 
-        concurrency_limit
-    )
-    conc_time = time.time() - start_time
-    
-    # Cleanup
-    await scraper.close()
+    try:
+        # Test sequential processing
+        logging.info("Starting sequential processing test...")
+        start_time = time.perf_counter()
+        results_seq, _ = await process_data(
+            scraper, 
+            df, 
+            DummyProgressBar(), 
+            DummyStatusText(), 
+            None, 
+            concurrency_limit=1
+        )
+        seq_time = time.perf_counter() - start_time
+        
+        # Drop what the first run cached so the second one fetches every page again
+        scraper._app_ids.clear()
+        scraper._search_cache.clear()
+        scraper._detail_cache.clear()
+        
+        # Test concurrent processing
+        logging.info("Starting concurrent processing test...")
+        start_time = time.perf_counter()
+        results_conc, _ = await process_data(
+            scraper, 
+            df, 
+            DummyProgressBar(), 
+            DummyStatusText(), 
+            None, 
+            concurrency_limit=concurrency_limit
+        )
+        conc_time = time.perf_counter() - start_time
+    finally:
+        # Cleanup
+        await scraper.aclose()
     
     # Calculate metrics
     total_policies = len(test_policies)
-    seq_success = len(results_seq) if results_seq else 0
-    conc_success = len(results_conc) if results_conc else 0
+    seq_success = len(results_seq)
+    conc_success = len(results_conc)
     
     metrics = {
         'sequential': {
@@ -150,21 +147,17 @@ async def main():
     ]
     
     logging.info("Starting performance test with 5 real policies...")
-    metrics = await run_performance_test(username, password, test_policies, batch_size=5, concurrency_limit=2)
+    metrics = await run_performance_test(username, password, test_policies, concurrency_limit=2)
+    if not metrics:
+        return
     
-    # Save results to CSV
+    # Save results to CSV - one row per mode, its counts taken from that run's results DataFrame
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    results_df = pd.DataFrame({
-        'mode': ['sequential', 'concurrent'],
-        'total_time': [metrics['sequential']['total_time'], metrics['concurrent']['total_time']],
-        'avg_time_per_policy': [metrics['sequential']['avg_time_per_policy'], metrics['concurrent']['avg_time_per_policy']],
-        'success_rate': [metrics['sequential']['success_rate'], metrics['concurrent']['success_rate']],
-        'success_count': [metrics['sequential']['success_count'], metrics['concurrent']['success_count']],
-        'error_count': [metrics['sequential']['error_count'], metrics['concurrent']['error_count']]
-    })
-    
-    results_df.to_csv(f'performance_test_results_{timestamp}.csv', index=False)
-    logging.info(f"Results saved to performance_test_results_{timestamp}.csv")
+    results_df = pd.DataFrame.from_records([{'mode': mode, **mode_metrics} for mode, mode_metrics in metrics.items()])
+    
+    results_path = f'performance_test_results_{timestamp}.csv'
+    if save_output_csv(results_df, results_path):
+        logging.info(f"Results saved to {results_path}")
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,238 @@
+import asyncio
+import time
+import pytest
+from pathlib import Path
+from src import requests_hybrid
+from src.requests_hybrid import ISCRequestsHybrid
+
+# Real search results page saved by src/debug_form.py
+SEARCH_RESULTS_HTML = (Path(__file__).parent.parent / 'src' / 'debug_response_SCB_GL_000078314.html').read_text(encoding='utf-8')
+
+EXPECTED_ROW = {
+    'policy_number': 'SCB-GL-000078314',
+    'app_id': '3346286',
+    'status': 'Bound',
+    'applicant_company': 'Cosmos Management Group, LLC',
+    'state': 'CA',
+    'program': 'Standard GL A-Rated',
+    'total_cost': '$6,845.90',
+    'effective_date': '02/10/2025'
+}
+
+@pytest.fixture
+def client():
+    return ISCRequestsHybrid(username='user', password='pass', use_disk_cache=False)
+
+def test_extract_search_results_data(client):
+    """Test row extraction from a saved search results page"""
+    data = client._extract_search_results_data(SEARCH_RESULTS_HTML, 'SCB-GL-000078314')
+    assert data == EXPECTED_ROW
+
+def test_extract_search_results_data_missing_policy(client):
+    """Test that an unknown policy yields no row"""
+    assert client._extract_search_results_data(SEARCH_RESULTS_HTML, 'SCB-GL-000000000') is None
+
+def test_extract_search_results_data_regex_fallback(client, monkeypatch):
+    """Test that the regex fallback produces the same row when lxml fails"""
+    def broken_parser(html, **kwargs):
+        raise ValueError("parser unavailable")
+    monkeypatch.setattr(requests_hybrid.lxml_html, 'fromstring', broken_parser)
+
+    data = client._extract_search_results_data(SEARCH_RESULTS_HTML, 'SCB-GL-000078314')
+    assert data == EXPECTED_ROW
+
+DETAIL_HTML = '''
+<dl class="dl-horizontal marginBottom-sm">
+    <dt>Policy Number:</dt>
+    <dd class=""><span id="policy_number_selector_80">ISCPC04000058472</span> </dd>
+</dl>
+<dl class="dl-horizontal marginBottom-sm">
+    <dt>Policy Term:</dt> <dd>07/11/2025 - 07/11/2026</dd>
+</dl>
+<dl class="dl-horizontal marginBottom-sm">
+    <dt>Cancellation Date:</dt>
+    <dd>
+        09/01/2025
+    </dd>
+</dl>
+'''
+
+def test_parse_detail_page_html(client):
+    """Test policy term and cancellation date extraction from a detail page"""
+    details = client._parse_detail_page_html(DETAIL_HTML)
+    assert details == {
+        'effective_date': '07/11/2025',
+        'expiration_date': '07/11/2026',
+        'cancellation_date': '09/01/2025'
+    }
+
+def test_parse_detail_page_html_without_cancellation(client):
+    """Test that active policies only report the policy term"""
+    html = DETAIL_HTML.split('<dt>Cancellation Date:</dt>')[0]
+    details = client._parse_detail_page_html(html)
+    assert details == {'effective_date': '07/11/2025', 'expiration_date': '07/11/2026'}
+
+def test_app_id_cache_round_trip(tmp_path, monkeypatch):
+    """Test that app_ids found by one run are loaded by the next"""
+    monkeypatch.setattr(requests_hybrid, 'CACHE_DIR', tmp_path)
+    monkeypatch.setattr(requests_hybrid, 'APP_ID_CACHE_PATH', tmp_path / 'app_ids.json')
+
+    first = ISCRequestsHybrid(username='user', password='pass')
+    first._app_ids['SCB-GL-000078314'] = '3346286'
+    first._save_app_id_cache()
+
+    second = ISCRequestsHybrid(username='user', password='pass')
+    assert second._app_ids == {'SCB-GL-000078314': '3346286'}
+
+def test_get_application_details_cached(client, monkeypatch):
+    """Test that a repeated app_id is served from the detail cache"""
+    calls = []
+    class FakeResponse:
+        status_code = 200
+        text = DETAIL_HTML
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        return FakeResponse()
+    monkeypatch.setattr(client.session, 'get', fake_get)
+    client.authenticated = True
+
+    first = client.get_application_details('3346286')
+    first['status'] = 'Bound'
+    second = client.get_application_details('3346286')
+    assert len(calls) == 1
+    assert 'status' not in second
+    assert second['cancellation_date'] == '09/01/2025'
+
+def test_extract_all_search_results(client):
+    """Test that a multi-policy page yields one entry per requested policy found"""
+    found = client._extract_all_search_results(SEARCH_RESULTS_HTML, ['SCB-GL-000078314', 'SCB-GL-000000000'])
+    assert found == {'SCB-GL-000078314': EXPECTED_ROW}
+
+LOGIN_HTML = '''
+<html><head><meta name="csrf-token" content="meta-token"></head>
+<body>
+<form method="post" action="/amp/login/authenticate">
+    <input type="hidden" name="_token" value="form-token">
+    <input type="text" name="username">
+    <input type="password" name="password">
+    <button class="btn btn-lg btn-block btn-default" type="submit">Login</button>
+</form>
+</body></html>
+'''
+
+def test_parse_login_form(client):
+    """Test that the login form's action and hidden fields are picked up"""
+    action, fields, csrf_token = client._parse_login_form(LOGIN_HTML, 'https://isc.onlinemga.com/amp/login')
+    assert action == 'https://isc.onlinemga.com/amp/login/authenticate'
+    assert fields == {'_token': 'form-token'}
+    assert csrf_token == 'meta-token'
+
+def test_clean_cell_text(client):
+    """Test that tags are dropped, entities decoded and whitespace collapsed"""
+    cell = '<a href="#">Smith &amp; Sons,&nbsp;LLC</a>\n   <span>&#36;1,200</span>'
+    assert client._clean_cell_text(cell) == 'Smith & Sons, LLC $1,200'
+
+def test_token_bucket_queues_past_burst():
+    """Test that reservations past the burst size are spaced at the configured rate"""
+    bucket = requests_hybrid._TokenBucket(rate=10, burst=2)
+    waits = [bucket.reserve() for _ in range(4)]
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.1, abs=0.01)
+    assert waits[3] == pytest.approx(0.2, abs=0.01)
+
+def test_search_row_scanner_stops_after_row(client):
+    """Test that a streamed page is cut right after the policy's row and still parses"""
+    page = SEARCH_RESULTS_HTML.encode('utf-8')
+    scanner = requests_hybrid._SearchRowScanner('SCB-GL-000078314')
+    chunks = [page[i:i + 1024] for i in range(0, len(page), 1024)]
+    fed = next(i for i, chunk in enumerate(chunks) if scanner.feed(chunk))
+    assert fed < len(chunks) - 1
+
+    html = scanner.html('utf-8')
+    assert html.endswith('</tr>')
+    assert client._extract_search_results_data(html, 'SCB-GL-000078314') == EXPECTED_ROW
+
+def test_search_row_scanner_without_match():
+    """Test that a page without the policy is returned whole"""
+    scanner = requests_hybrid._SearchRowScanner('SCB-GL-000000000')
+    assert not scanner.feed(SEARCH_RESULTS_HTML.encode('utf-8'))
+    assert scanner.html('utf-8') == SEARCH_RESULTS_HTML
+
+def test_parse_detail_page_html_date_range_fallback(client):
+    """Test that the general date-range fallback skips implausible policy terms"""
+    year = time.localtime().tm_year
+    html = f'<p>Created 01/05/2010 - 01/05/2011</p><p>Coverage 13/40/{year} - 01/01/{year + 1}</p><p>Coverage 03/01/{year} - 03/01/{year + 1}</p>'
+    details = client._parse_detail_page_html(html)
+    assert details == {'effective_date': f'03/01/{year}', 'expiration_date': f'03/01/{year + 1}'}
+
+def test_process_policy_auto_skips_detail_for_active_policy(monkeypatch):
+    """Test that fetch_detail='auto' only fetches the detail page when it adds a needed field"""
+    client = ISCRequestsHybrid(username='user', password='pass', use_disk_cache=False, needs_expiration=False)
+    fetched = []
+    monkeypatch.setattr(client, 'get_application_details', lambda app_id: fetched.append(app_id) or {})
+
+    assert client.process_policy('SCB-GL-000078314', search_data=dict(EXPECTED_ROW)) == EXPECTED_ROW
+    assert fetched == []
+
+    client.process_policy('SCB-GL-000078314', search_data=dict(EXPECTED_ROW, status='Cancelled'))
+    assert fetched == ['3346286']
+
+def test_session_valid(client):
+    """Test that a client is only reusable while logged in with unexpired cookies"""
+    assert not client.session_valid()
+    client.authenticated = True
+    client.session.cookies.set('laravel_session', 'abc', domain='isc.onlinemga.com', expires=int(time.time()) + 3600)
+    assert client.session_valid()
+    client.session.cookies.set('XSRF-TOKEN', 'xyz', domain='isc.onlinemga.com', expires=int(time.time()) - 1)
+    assert not client.session_valid()
+
+def test_aimd_limiter_halves_and_recovers():
+    """Test that throttling halves the concurrency limit and a streak of successes wins it back"""
+    async def run():
+        limiter = requests_hybrid._AIMDLimiter(8, increase_after=2)
+        await limiter.record(429)
+        await limiter.record(503)
+        assert limiter.limit == 2
+        for _ in range(4):
+            await limiter.record(200)
+        assert limiter.limit == 4
+        for _ in range(20):
+            await limiter.record(200)
+        assert limiter.limit == 8
+    asyncio.run(run())
+
+def test_cookie_cache_keeps_expiry(tmp_path, monkeypatch):
+    """Test that restored session cookies keep their expiry for session_valid()"""
+    monkeypatch.setattr(requests_hybrid, 'CACHE_DIR', tmp_path)
+    monkeypatch.setattr(requests_hybrid, 'COOKIE_CACHE_PATH', tmp_path / 'cookies.json')
+    expires = int(time.time()) + 3600
+
+    first = ISCRequestsHybrid(username='user', password='pass')
+    first.session.cookies.set('laravel_session', 'abc', domain='isc.onlinemga.com', expires=expires)
+    first._save_cached_cookies()
+
+    class FakeResponse:
+        status_code = 200
+        url = requests_hybrid.HOME_URL
+    second = ISCRequestsHybrid(username='user', password='pass')
+    monkeypatch.setattr(second.session, 'get', lambda url, **kwargs: FakeResponse())
+    assert second._load_cached_cookies()
+    assert [cookie.expires for cookie in second.session.cookies] == [expires]
+
+def test_process_policies_concurrent_times_out_stuck_policy(client, monkeypatch):
+    """Test that a policy stuck past POLICY_TIMEOUT counts as failed without holding back the batch"""
+    monkeypatch.setattr(requests_hybrid, 'POLICY_TIMEOUT', 0.2)
+    monkeypatch.setattr(client, '_save_app_id_cache', lambda: None)
+    def process_policy(policy, search_data=None):
+        if policy == 'STUCK':
+            time.sleep(1)
+        return {'policy_number': policy}
+    monkeypatch.setattr(client, 'process_policy', process_policy)
+
+    progress = []
+    start = time.monotonic()
+    results = client.process_policies_concurrent(['A', 'STUCK', 'B'], max_workers=2, batch_search=False,
+                                                 progress_callback=lambda *args: progress.append(args))
+    assert time.monotonic() - start < 0.9
+    assert sorted(result['policy_number'] for result in results) == ['A', 'B']
+    assert progress[-1] == (3, 3, 2, 1)
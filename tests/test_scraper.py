@@ -1,7 +1,8 @@
 import pytest
 import asyncio
-from src.scraper import ISCScraper
+from src.scraper import ISCScraper, detail_fields_from_html, dates_from_detail_fields, search_row_from_html, _detail_block
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -60,3 +61,65 @@ async def test_extract_policy_details(scraper):
         assert 'app_id' in details
     
     await scraper.close()
+
+DETAIL_HTML = '''
+<dl class="dl-horizontal marginBottom-sm">
+    <dt>Policy Term:</dt> <dd>07/11/2025 - 07/11/2026</dd>
+</dl>
+<dl class="dl-horizontal marginBottom-sm">
+    <dt>Cancellation Date:</dt>
+    <dd>
+        09/01/2025
+    </dd>
+</dl>
+'''
+
+def test_dates_from_detail_fields():
+    """Test date extraction from the labelled <dt>/<dd> pairs of a detail page"""
+    fields = detail_fields_from_html(DETAIL_HTML)
+    assert fields == {'Policy Term:': '07/11/2025 - 07/11/2026', 'Cancellation Date:': '09/01/2025'}
+    assert dates_from_detail_fields(fields) == {
+        'effective_date': '07/11/2025',
+        'expiration_date': '07/11/2026',
+        'cancellation_date': '09/01/2025'
+    }
+
+def test_detail_block():
+    """Test that the fallback regexes get just the labelled block, or the whole page when it has no labels"""
+    block = _detail_block(DETAIL_HTML)
+    assert block.startswith('<dt>Policy Term:</dt>')
+    assert block.endswith('</dl>')
+    assert '09/01/2025' in block and 'Policy Number:' not in block
+    assert _detail_block('<p>nothing here</p>') == '<p>nothing here</p>'
+
+def test_search_row_from_html():
+    """Test search row extraction from a saved search results page"""
+    page = (Path(__file__).parent.parent / 'src' / 'debug_response_SCB_GL_000078314.html').read_bytes()
+    assert search_row_from_html(page, 'SCB-GL-000078314') == {
+        'policy_number': 'SCB-GL-000078314',
+        'app_id': '3346286',
+        'status': 'Bound',
+        'applicant_company': 'Cosmos Management Group, LLC',
+        'state': 'CA',
+        'program': 'Standard GL A-Rated',
+        'total_cost': '$6,845.90',
+        'effective_date': '02/10/2025'
+    }
+    assert search_row_from_html(page, 'SCB-GL-000000000') is None
+
+def test_saved_state_is_per_user(tmp_path):
+    """Test that a saved session is written owner-only and only restored for the same username"""
+    path = tmp_path / 'auth.json'
+    state = {'cookies': [{'name': 'laravel_session', 'value': 'abc'}], 'origins': []}
+    class FakeContext:
+        async def storage_state(self):
+            return state
+
+    owner = ISCScraper(username='alice', password='pass', storage_state_path=str(path))
+    owner.context = FakeContext()
+    asyncio.run(owner._save_state())
+    if os.name == 'posix':
+        assert path.stat().st_mode & 0o777 == 0o600
+
+    assert owner._load_saved_state() == state
+    assert ISCScraper(username='bob', password='pass', storage_state_path=str(path))._load_saved_state() is None